@@ -0,0 +1,113 @@
+"""Lazy image loading on a background worker pool.
+
+Every image the game draws is listed in MANIFEST under a short name.
+Nothing is decoded up front: request() queues a decode on the pool and
+returns a future, and image() hands out the decoded QImage, or a null
+placeholder while it is still loading. When a decode finishes the
+manager emits loaded(name) on the GUI thread, so the view can repaint.
+
+QImage and QImageReader are safe to use off the GUI thread as long as
+each instance stays on one thread; pixmaps are only made on the GUI side.
+
+When a prebuilt asset pack (see asset_pack.py) is given, images and
+sprites found in it are handed out straight from the memory-mapped file
+and never decoded.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QTransform
+
+# Asset name -> path relative to the asset directory
+MANIFEST = {
+    'apple': 'apple.png',
+    'apple_gold_glow': 'apple_gold_glow.png',
+    'apple_gold_glow_out': 'apple_gold_glow_out.png',
+    'body': 'snake_body.png',
+    'head': 'snake_head.png',
+    'green_crystal': os.path.join('mission', 'mission 1', 'green_crystal.png'),
+    'red_crystal': os.path.join('mission', 'mission 1', 'red_crystal.png'),
+    'mission1_background': os.path.join('mission', 'mission 1', 'mission1_background.png'),
+}
+MANIFEST.update({f'boulder{i}': os.path.join('boulder', f'boulder{i + 1}.png') for i in range(9)})
+
+# What a game needs on screen, decoded in the background right after startup
+GAME_ASSETS = ('apple', 'apple_gold_glow', 'apple_gold_glow_out', 'body', 'head',
+               'green_crystal', 'red_crystal') + tuple(f'boulder{i}' for i in range(9))
+
+
+def prepare_sprite(name, image, width, height, rotation=0):
+    """Scale and rotate an image to a sprite of width x height pixels"""
+    # Crystals are stretched smoothly over the cell; the pixel-art sprites
+    # use nearest-neighbor (fast) scaling and keep their aspect ratio
+    if name.endswith('_crystal'):
+        aspect, mode = Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+    else:
+        aspect, mode = Qt.KeepAspectRatio, Qt.FastTransformation
+    image = image.scaled(width, height, aspect, mode)
+
+    if rotation:
+        transform = QTransform()
+        transform.rotate(rotation)
+        image = image.transformed(transform, Qt.SmoothTransformation)
+    return image
+
+
+class AssetManager(QObject):
+    """Decodes manifest images on a thread pool, each at most once"""
+
+    # Emitted (queued to the GUI thread) with the name of each decoded asset
+    loaded = pyqtSignal(str)
+
+    def __init__(self, asset_dir, manifest=MANIFEST, workers=4, pack=None):
+        super().__init__()
+        self.asset_dir = asset_dir
+        self.pack = pack
+        self.manifest = {name: path for name, path in manifest.items()
+                         if os.path.exists(os.path.join(asset_dir, path))}
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asset')
+        self.futures = {}
+
+    def available(self, prefix):
+        """Names of the manifest assets starting with prefix whose files exist"""
+        return [name for name in self.manifest if name.startswith(prefix)]
+
+    def request(self, name):
+        """Future for the decoded image; queues the decode on first request"""
+        future = self.futures.get(name)
+        if future is None:
+            future = self.pool.submit(self._decode, name)
+            future.add_done_callback(lambda _: self.loaded.emit(name))
+            self.futures[name] = future
+        return future
+
+    def preload(self, names):
+        """Queue decodes for assets that will be needed soon"""
+        for name in names:
+            if name in self.manifest and not (self.pack and self.pack.has_source(name)):
+                self.request(name)
+
+    def image(self, name, wait=False):
+        """Decoded image, or a null QImage while it is loading (unless wait)"""
+        if name not in self.manifest:
+            return QImage()
+        if self.pack is not None and self.pack.has_source(name):
+            return self.pack.source(name)
+        future = self.request(name)
+        if not wait and not future.done():
+            return QImage()
+        return future.result()
+
+    def sprite(self, name, width, height, rotation=0):
+        """Prebuilt sprite from the pack, or None if it has to be made"""
+        if self.pack is None:
+            return None
+        return self.pack.sprite(name, width, height, rotation)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _decode(self, name):
+        reader = QImageReader(os.path.join(self.asset_dir, self.manifest[name]))
+        return reader.read()
@@ -0,0 +1,195 @@
+"""Prebuilt asset pack: every sprite as raw pixels in one memory-mapped file.
+
+The pack holds premultiplied ARGB32 pixels, ready for QImage, for:
+
+  - each manifest image ("sources"); game sprites are downscaled to at
+    most MAX_SOURCE_SIDE pixels per side, as the crystals are 4000px
+    squares that are only ever drawn at cell size, while backgrounds keep
+    their full size for the intros that scale them to the screen
+  - the sprites the game draws at the given screen sizes and pixel ratios,
+    already scaled and rotated exactly as the game would do it
+
+Layout: an 8 byte magic, the offset and length of a JSON index (two
+little-endian uint64), the 64-byte aligned pixel blocks, then the index.
+The index also records the size and mtime of every source file, so
+entries whose file changed after the build are ignored and the game
+falls back to decoding that file.
+
+At runtime the file is mapped with mmap and QImages point straight into
+the mapping: opening the pack decodes and copies nothing, and pages are
+only read in when a sprite is actually drawn.
+
+Build it with:
+
+    python asset_pack.py --screen 1920x1080 --screen 2560x1440 --dpr 1 --dpr 2
+"""
+import argparse
+import ctypes
+import json
+import mmap
+import os
+import struct
+import sys
+
+from PyQt5 import sip
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QImageReader
+
+from asset_manager import GAME_ASSETS, MANIFEST, prepare_sprite
+
+MAGIC = b'SNAKEPK1'
+HEADER = struct.Struct('<8sQQ')
+ALIGNMENT = 64
+MAX_SOURCE_SIDE = 512
+
+# Same grid geometry as SnakeGame: 35 pixel cells filling the screen
+CELL_SIZE = 35
+
+
+def sprite_key(name, width, height, rotation=0):
+    return f'{name}@{width}x{height}r{rotation}'
+
+
+def screen_sprites(screen_width, screen_height, dpr):
+    """(name, width, height, rotation) of every sprite drawn on a screen, in pixels"""
+    cell_size_x = screen_width / (screen_width // CELL_SIZE)
+    cell_size_y = screen_height / (screen_height // CELL_SIZE)
+    cell = round(CELL_SIZE * dpr)
+
+    sprites = [(name, cell, cell, 0) for name in ('apple', 'apple_gold_glow', 'apple_gold_glow_out', 'body')]
+    sprites += [('head', cell, cell, rotation) for rotation in (0, 90, 180, 270)]
+    for name in ('green_crystal', 'red_crystal'):
+        sprites.append((name, round(round(cell_size_x) * dpr), round(round(cell_size_y) * dpr), 0))
+    boulder_width = round(round(2 * cell_size_x) * dpr)
+    boulder_height = round(round(2 * cell_size_y) * dpr)
+    sprites += [(name, boulder_width, boulder_height, 0) for name in MANIFEST if name.startswith('boulder')]
+    return sprites
+
+
+class AssetPack:
+    """Read-only view of a pack file"""
+
+    def __init__(self, path, asset_dir):
+        with open(path, 'rb') as f:
+            # A private mapping: pages come from the file and are never written
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, index_offset, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an asset pack')
+        index = json.loads(self.map[index_offset:index_offset + index_length])
+
+        # Leave out everything built from a file that has changed since
+        stale = set()
+        for name, (size, mtime_ns) in index['sources'].items():
+            try:
+                stat = os.stat(os.path.join(asset_dir, MANIFEST[name]))
+            except (KeyError, OSError):
+                stale.add(name)
+                continue
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                stale.add(name)
+        self.entries = {key: entry for key, entry in index['images'].items()
+                        if key.split('@')[0] not in stale}
+        self.images = {}
+
+    @classmethod
+    def open(cls, path, asset_dir):
+        """The pack at path, or None if there is none or it can't be read"""
+        try:
+            return cls(path, asset_dir)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def has_source(self, name):
+        return name in self.entries
+
+    def source(self, name):
+        return self._image(name)
+
+    def sprite(self, name, width, height, rotation=0):
+        """Prebuilt sprite, or None if the pack has none of that size"""
+        key = sprite_key(name, width, height, rotation)
+        return self._image(key) if key in self.entries else None
+
+    def _image(self, key):
+        image = self.images.get(key)
+        if image is None:
+            width, height, offset = self.entries[key]
+            address = ctypes.addressof(ctypes.c_char.from_buffer(self.map, offset))
+            # No copy: the QImage reads the mapped pages, which this pack keeps alive
+            image = QImage(sip.voidptr(address), width, height, width * 4,
+                           QImage.Format_ARGB32_Premultiplied)
+            self.images[key] = image
+        return image
+
+
+def build_pack(asset_dir, path, screens, dprs):
+    """Write a pack with the sources and the sprites for every screen and pixel ratio"""
+    sources = {}
+    index = {}
+    blocks = []
+    offset = HEADER.size
+
+    def add(key, image):
+        nonlocal offset
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        data = image.constBits().asstring(image.sizeInBytes())
+        index[key] = (image.width(), image.height(), offset)
+        blocks.append((offset, data))
+        offset += len(data)
+
+    images = {}
+    for name, relative_path in MANIFEST.items():
+        file_path = os.path.join(asset_dir, relative_path)
+        image = QImageReader(file_path).read()
+        if image.isNull():
+            continue
+        stat = os.stat(file_path)
+        sources[name] = (stat.st_size, stat.st_mtime_ns)
+        images[name] = image
+
+        if name in GAME_ASSETS and max(image.width(), image.height()) > MAX_SOURCE_SIDE:
+            image = image.scaled(MAX_SOURCE_SIDE, MAX_SOURCE_SIDE, Qt.KeepAspectRatio,
+                                 Qt.SmoothTransformation)
+        add(name, image)
+
+    for screen_width, screen_height in screens:
+        for dpr in dprs:
+            for name, width, height, rotation in screen_sprites(screen_width, screen_height, dpr):
+                key = sprite_key(name, width, height, rotation)
+                if name in images and key not in index:
+                    add(key, prepare_sprite(name, images[name], width, height, rotation))
+
+    index_data = json.dumps({'sources': sources, 'images': index}).encode('utf-8')
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, offset, len(index_data)))
+        for block_offset, data in blocks:
+            f.seek(block_offset)
+            f.write(data)
+        f.seek(offset)
+        f.write(index_data)
+    os.replace(temporary_path, path)
+    return len(index)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Build the prebuilt sprite pack')
+    parser.add_argument('--screen', action='append', default=[],
+                        help='screen size WIDTHxHEIGHT to prebuild sprites for (repeatable)')
+    parser.add_argument('--dpr', action='append', type=float, default=[],
+                        help='device pixel ratio to prebuild sprites for (repeatable)')
+    parser.add_argument('--output', help='pack file (default: asset/sprites.pack)')
+    args = parser.parse_args(argv)
+
+    asset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'asset')
+    screens = [tuple(int(part) for part in screen.split('x')) for screen in args.screen or ['1920x1080']]
+    output = args.output or os.path.join(asset_dir, 'sprites.pack')
+    count = build_pack(asset_dir, output, screens, args.dpr or [1.0])
+    print(f'Wrote {count} images to {output} ({os.path.getsize(output) // 1024} KiB)')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,458 @@
+"""Sound effects mixed from pre-decoded PCM.
+
+Every effect is decoded once, at startup, to 16-bit stereo PCM at 44.1kHz.
+Playing a sound just claims one of a fixed pool of voices, so effects
+overlap instead of cutting each other off and nothing is opened or
+decoded at trigger time. The mixer sums the active voices, applying each
+voice's volume times its channel's volume.
+
+AudioEngine itself has no Qt dependency; it is fed to a sink that pulls
+mixed audio from it. QtAudioSink plays through QAudioOutput with a 10ms
+buffer; NullSink discards everything and is what tests (and machines
+without an audio device) get.
+
+Mixing and format conversion use audioop where it exists. It was
+removed in Python 3.13; there the same operations run on array('h').
+
+Decoded sounds are cached as WAV files in the engine's format, named
+after a hash of the source file's contents. Later launches read the
+cache instead of decoding MP3s; a changed source file hashes differently
+and is decoded again, and its old cache file is removed.
+"""
+import glob
+import hashlib
+import math
+import operator
+import os
+import threading
+import time
+import warnings
+import wave
+from array import array
+from collections import deque
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:
+        audioop = None
+
+RATE = 44100
+CHANNELS = 2
+WIDTH = 2  # Bytes per sample
+FRAME_BYTES = CHANNELS * WIDTH
+
+BUFFER_MS = 10
+
+SAMPLE_MIN = -0x8000
+SAMPLE_MAX = 0x7FFF
+
+
+def samples(data):
+    """16-bit PCM as an array of samples"""
+    values = array('h')
+    values.frombytes(data)
+    return values
+
+
+def mix_chunks(chunks):
+    """Sum of (16-bit PCM, gain) pairs, all the same length, clipped"""
+    if audioop is not None:
+        mixed = None
+        for chunk, gain in chunks:
+            if gain != 1.0:
+                chunk = audioop.mul(chunk, WIDTH, gain)
+            mixed = chunk if mixed is None else audioop.add(mixed, chunk, WIDTH)
+        return mixed
+
+    # Sum in Python ints and clip once at the end
+    total = None
+    for chunk, gain in chunks:
+        values = samples(chunk)
+        if gain != 1.0:
+            values = [math.floor(value * gain) for value in values]
+        total = list(values) if total is None else list(map(operator.add, total, values))
+    return array('h', [min(max(value, SAMPLE_MIN), SAMPLE_MAX) for value in total]).tobytes()
+
+
+def to_16bit(data, width):
+    """PCM of 1 to 4 byte samples as 16-bit PCM"""
+    if audioop is not None:
+        return audioop.lin2lin(data, width, WIDTH)
+    if width == 1:
+        values = array('h', [value << 8 for value in array('b', data)])
+    elif width == 3:
+        values = array('h', [int.from_bytes(data[i:i + 3], 'little', signed=True) >> 8
+                             for i in range(0, len(data) - 2, 3)])
+    elif width == 4:
+        values = array('h', [value >> 16 for value in array('i', data)])
+    else:
+        raise ValueError(f'unsupported sample width {width}')
+    return values.tobytes()
+
+
+def to_stereo(data):
+    """16-bit mono PCM as stereo, the same on both channels"""
+    if audioop is not None:
+        return audioop.tostereo(data, WIDTH, 1, 1)
+    mono = samples(data)
+    stereo = array('h', bytes(2 * len(data)))
+    stereo[0::2] = mono
+    stereo[1::2] = mono
+    return stereo.tobytes()
+
+
+def resample(data, rate, new_rate, state):
+    """Stereo 16-bit PCM at new_rate; returns (data, state for the next chunk)
+
+    state is None for the first chunk of a stream.
+    """
+    if audioop is not None:
+        return audioop.ratecv(data, WIDTH, CHANNELS, rate, new_rate, state)
+
+    # Linear interpolation between the previous frame and the next; phase
+    # is how far past the previous frame the next output frame lies, in
+    # 1/new_rate of an input frame
+    values = samples(data)
+    if state is None:
+        if len(values) < CHANNELS:
+            return b'', None
+        phase, left, right = 0, values[0], values[1]
+        start = CHANNELS
+    else:
+        phase, left, right = state
+        start = 0
+
+    out = array('h')
+    for i in range(start, len(values) - 1, CHANNELS):
+        next_left = values[i]
+        next_right = values[i + 1]
+        while phase < new_rate:
+            out.append(left + (next_left - left) * phase // new_rate)
+            out.append(right + (next_right - right) * phase // new_rate)
+            phase += rate
+        phase -= new_rate
+        left = next_left
+        right = next_right
+    return out.tobytes(), (phase, left, right)
+
+
+class PcmConverter:
+    """Converts a stream of PCM chunks to the engine's format
+
+    The resampler's state is carried from one chunk to the next, so a
+    sound decoded in pieces has no clicks where the pieces join.
+    """
+
+    def __init__(self, channels, rate, width):
+        if channels not in (1, CHANNELS):
+            raise ValueError(f'unsupported channel count {channels}')
+        self.channels = channels
+        self.rate = rate
+        self.width = width
+        self.state = None
+
+    def convert(self, data):
+        if self.width != WIDTH:
+            data = to_16bit(data, self.width)
+        if self.channels == 1:
+            data = to_stereo(data)
+        if self.rate != RATE:
+            data, self.state = resample(data, self.rate, RATE, self.state)
+        return data
+
+
+def convert_pcm(data, channels, rate, width):
+    """Convert raw PCM, a whole sound, to the engine's format"""
+    return PcmConverter(channels, rate, width).convert(data)
+
+
+def read_wav(path):
+    """PCM of a WAV file in the engine's format"""
+    with wave.open(path, 'rb') as f:
+        data = f.readframes(f.getnframes())
+        return convert_pcm(data, f.getnchannels(), f.getframerate(), f.getsampwidth())
+
+
+def write_wav(path, pcm):
+    """Atomically write engine PCM as a WAV file"""
+    temporary_path = path + '.tmp'
+    with wave.open(temporary_path, 'wb') as f:
+        f.setnchannels(CHANNELS)
+        f.setsampwidth(WIDTH)
+        f.setframerate(RATE)
+        f.writeframes(pcm)
+    os.replace(temporary_path, path)
+
+
+def content_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class Voice:
+    """One playing sound"""
+
+    __slots__ = ('pcm', 'position', 'end', 'volume', 'channel', 'triggered')
+
+    def __init__(self, pcm, end, volume, channel, triggered):
+        self.pcm = pcm
+        self.position = 0
+        self.end = end
+        self.volume = volume
+        self.channel = channel
+        self.triggered = triggered  # perf_counter() at play(); None once mixed
+
+
+class AudioEngine:
+    """Pool of voices mixed into one stream"""
+
+    def __init__(self, voices=8):
+        self.sounds = {}
+        self.max_voices = voices
+        self.voices = []
+        self.channel_volumes = {}
+        self.master_volume = 1.0
+        self.lock = threading.Lock()  # Sinks may pull from an audio thread
+        self.sink = None
+
+        # Milliseconds from play() until the sound was first mixed
+        self.latencies = deque(maxlen=256)
+
+    def attach(self, sink):
+        self.sink = sink
+        sink.start(self)
+
+    def add_sound(self, name, pcm):
+        """Register decoded PCM in the engine's format"""
+        self.sounds[name] = pcm
+
+    def set_channel_volume(self, channel, volume):
+        self.channel_volumes[channel] = volume
+
+    def play(self, name, channel='effects', volume=1.0, duration_ms=None):
+        """Start a sound on a free voice; the oldest voice is reused if none is free"""
+        pcm = self.sounds.get(name)
+        if pcm is None:
+            return
+        end = len(pcm)
+        if duration_ms is not None:
+            end = min(end, int(RATE * duration_ms / 1000) * FRAME_BYTES)
+
+        voice = Voice(pcm, end, volume, channel, time.perf_counter())
+        with self.lock:
+            if len(self.voices) >= self.max_voices:
+                self.voices.pop(0)
+            self.voices.append(voice)
+        if self.sink is not None:
+            self.sink.wake()
+
+    def stop(self, channel=None):
+        """Silence every voice, or only those on one channel"""
+        with self.lock:
+            if channel is None:
+                self.voices.clear()
+            else:
+                self.voices = [voice for voice in self.voices if voice.channel != channel]
+
+    def is_playing(self):
+        return bool(self.voices)
+
+    def mix(self, frames):
+        """The next frames of mixed audio as PCM bytes"""
+        size = frames * FRAME_BYTES
+        chunks = []
+        now = time.perf_counter()
+        with self.lock:
+            finished = False
+            for voice in self.voices:
+                if voice.triggered is not None:
+                    self.latencies.append((now - voice.triggered) * 1000)
+                    voice.triggered = None
+
+                start = voice.position
+                stop = min(start + size, voice.end)
+                chunk = voice.pcm[start:stop]
+                voice.position = stop
+                if stop >= voice.end:
+                    finished = True
+
+                if len(chunk) < size:
+                    chunk += bytes(size - len(chunk))
+                gain = voice.volume * self.channel_volumes.get(voice.channel, 1.0) * self.master_volume
+                chunks.append((chunk, gain))
+
+            if finished:
+                self.voices = [voice for voice in self.voices if voice.position < voice.end]
+        return mix_chunks(chunks) if chunks else bytes(size)
+
+
+class NullSink:
+    """Sink without an audio device; tests pull audio by hand"""
+
+    def start(self, engine):
+        self.engine = engine
+
+    def wake(self):
+        pass
+
+    def pull(self, ms):
+        return self.engine.mix(RATE * ms // 1000)
+
+
+class QtAudioSink:
+    """Plays the mix through QAudioOutput in pull mode
+
+    The output is suspended while nothing plays, so an idle game does not
+    wake up for audio, and resumed by the next play().
+    """
+
+    @classmethod
+    def create(cls):
+        """A sink on the default output device, or None if there is none"""
+        try:
+            from PyQt5.QtMultimedia import QAudioDeviceInfo
+        except ImportError:
+            return None
+        device = QAudioDeviceInfo.defaultOutputDevice()
+        if device.isNull() or not device.isFormatSupported(audio_format()):
+            return None
+        return cls()
+
+    def start(self, engine):
+        from PyQt5.QtCore import QIODevice, QTimer
+        from PyQt5.QtMultimedia import QAudio, QAudioOutput
+
+        class MixerDevice(QIODevice):
+            """Endless stream read from the engine's mixer"""
+
+            def readData(self, max_length):
+                data = engine.mix(max_length // FRAME_BYTES)
+                if not engine.is_playing():
+                    QTimer.singleShot(0, sink.suspend_if_idle)
+                return data
+
+            def writeData(self, data):
+                return 0
+
+            def bytesAvailable(self):
+                return RATE * BUFFER_MS // 1000 * FRAME_BYTES + super().bytesAvailable()
+
+        sink = self
+        self.engine = engine
+        self.idle_state = QAudio.SuspendedState
+        self.device = MixerDevice()
+        self.device.open(QIODevice.ReadOnly)
+        self.output = QAudioOutput(audio_format())
+        self.output.setBufferSize(RATE * BUFFER_MS // 1000 * FRAME_BYTES)
+        self.output.start(self.device)
+        self.output.suspend()
+
+    def wake(self):
+        if self.output.state() == self.idle_state:
+            self.output.resume()
+
+    def suspend_if_idle(self):
+        if not self.engine.is_playing() and self.output.state() != self.idle_state:
+            self.output.suspend()
+
+
+def audio_format():
+    """QAudioFormat of the engine's PCM"""
+    from PyQt5.QtMultimedia import QAudioFormat
+    audio = QAudioFormat()
+    audio.setSampleRate(RATE)
+    audio.setChannelCount(CHANNELS)
+    audio.setSampleSize(WIDTH * 8)
+    audio.setCodec('audio/pcm')
+    audio.setByteOrder(QAudioFormat.LittleEndian)
+    audio.setSampleType(QAudioFormat.SignedInt)
+    return audio
+
+
+class SoundLoader:
+    """Decodes sound files to engine PCM; WAV directly, the rest with QAudioDecoder
+
+    QAudioDecoder works on the backend's own thread and reports through
+    signals, so decoding never blocks the GUI thread. With a cache_dir,
+    decoded sounds are kept there and only decoded again when the source
+    file's contents change.
+    """
+
+    def __init__(self, engine, cache_dir=None):
+        self.engine = engine
+        self.cache_dir = cache_dir
+        self.decoders = {}
+
+    def load(self, name, path):
+        try:
+            key = content_hash(path)
+        except OSError:
+            return
+
+        if self.cache_dir is not None:
+            try:
+                self.engine.add_sound(name, read_wav(self._cache_path(name, key)))
+                return
+            except (OSError, EOFError, wave.Error):
+                pass  # Not cached yet (or unreadable): decode it again
+
+        if path.lower().endswith('.wav'):
+            try:
+                self._decoded(name, key, read_wav(path))
+            except (OSError, EOFError, wave.Error, ValueError):
+                pass
+            return
+
+        try:
+            from PyQt5.QtMultimedia import QAudioDecoder
+        except ImportError:
+            return
+        decoder = QAudioDecoder()
+        decoder.setAudioFormat(audio_format())
+        decoder.setSourceFilename(path)
+        chunks = []
+        converters = {}  # One per buffer format, carrying its resampler state
+
+        def buffer_ready():
+            buffer = decoder.read()
+            audio = buffer.format()
+            data = buffer.constData().asstring(buffer.byteCount())
+            key = (audio.channelCount(), audio.sampleRate(), audio.sampleSize() // 8)
+            converter = converters.get(key)
+            if converter is None:
+                converter = converters[key] = PcmConverter(*key)
+            chunks.append(converter.convert(data))
+
+        def finished():
+            del self.decoders[name]
+            self._decoded(name, key, b''.join(chunks))
+
+        def failed(*args):
+            self.decoders.pop(name, None)
+
+        decoder.bufferReady.connect(buffer_ready)
+        decoder.finished.connect(finished)
+        decoder.error.connect(failed)
+        self.decoders[name] = decoder
+        decoder.start()
+
+    def _cache_path(self, name, key):
+        return os.path.join(self.cache_dir, f'{name}-{key}.wav')
+
+    def _decoded(self, name, key, pcm):
+        self.engine.add_sound(name, pcm)
+        if self.cache_dir is None:
+            return
+
+        path = self._cache_path(name, key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_wav(path, pcm)
+            # Drop what was cached for earlier versions of the file
+            for stale in glob.glob(os.path.join(glob.escape(self.cache_dir), f'{glob.escape(name)}-*.wav')):
+                if stale != path:
+                    os.remove(stale)
+        except OSError:
+            pass  # The cache is only an optimization
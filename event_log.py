@@ -0,0 +1,113 @@
+"""Structured event log for gameplay telemetry.
+
+Records are dicts with a wall-clock time, a level and an event name, kept
+in a bounded ring buffer and written out as JSON Lines by a background
+thread in batches, so the game loop never waits on file I/O. If the
+writer falls behind, the oldest records are dropped.
+
+A disabled log has level OFF; callers compare against it before building
+a record, so logging costs a single comparison when it is off:
+
+    if log.level <= DEBUG:
+        log.record(DEBUG, 'tick', head=head)
+
+Set SNAKE_EVENT_LOG to a file path (and optionally SNAKE_EVENT_LOG_LEVEL
+to debug/info/warning/error) to turn it on for the game.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+
+
+class EventLog:
+    """Ring buffer of records flushed to a JSON Lines file on a worker thread"""
+
+    def __init__(self, path=None, level=INFO, capacity=4096, flush_interval=1.0):
+        self.path = path
+        self.level = level if path is not None else OFF
+        self.buffer = deque(maxlen=capacity)
+        self.flush_interval = flush_interval  # Seconds a batch may build up before writing
+
+        self.recorded = 0
+        self.written = 0
+
+        self.file = None
+        self.thread = None
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()  # Serializes writers (worker and close)
+        if self.level < OFF:
+            self.file = open(path, 'a', encoding='utf-8')
+            self.thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+            self.thread.start()
+
+    @classmethod
+    def from_environment(cls):
+        """Log configured by SNAKE_EVENT_LOG / SNAKE_EVENT_LOG_LEVEL, off if unset"""
+        path = os.environ.get('SNAKE_EVENT_LOG')
+        name = os.environ.get('SNAKE_EVENT_LOG_LEVEL', 'info').lower()
+        levels = {level_name: level for level, level_name in LEVEL_NAMES.items()}
+        return cls(path, levels.get(name, INFO))
+
+    @property
+    def dropped(self):
+        """Records overwritten in the ring buffer before they were written"""
+        return self.recorded - self.written - len(self.buffer)
+
+    def record(self, level, event, **fields):
+        """Add a record if level passes the threshold"""
+        if level < self.level:
+            return
+        entry = {'time': time.time(), 'level': LEVEL_NAMES.get(level, level), 'event': event}
+        entry.update(fields)
+        self.buffer.append(entry)
+        self.recorded += 1
+        # Wake the writer when a batch starts; it waits flush_interval for more
+        if len(self.buffer) == 1:
+            self.wake.set()
+
+    def flush(self):
+        """Write every buffered record to the file"""
+        with self.lock:
+            if self.file is None:
+                return
+            buffer = self.buffer
+            lines = []
+            while buffer:
+                lines.append(json.dumps(buffer.popleft(), separators=(',', ':')))
+            if lines:
+                self.file.write('\n'.join(lines) + '\n')
+                self.file.flush()
+                self.written += len(lines)
+
+    def close(self):
+        """Stop the writer, flush what is left and close the file"""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.wake.set()
+        self.thread.join()
+        self.thread = None
+        self.flush()
+        with self.lock:
+            self.file.close()
+            self.file = None
+        self.level = OFF
+
+    def _run(self):
+        while not self.stopping.is_set():
+            # Sleep until there is something to write, then let a batch build up
+            self.wake.wait()
+            self.wake.clear()
+            self.stopping.wait(self.flush_interval)
+            self.flush()
@@ -0,0 +1,156 @@
+"""Mission intro screens, pre-rendered on a worker thread.
+
+An intro is the mission's background scaled to the screen with the title
+and the story box painted over it. Laying out the rich-text story and
+smooth-scaling a full-screen background took long enough to stall the
+click on a level box, so the whole picture is rendered into one QImage
+in the background while the campaign menu is up, and the intro screen
+only draws that image under its Next button.
+
+Rendered intros are cached by mission and resolution.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QImage, QPainter, QPainterPath, QPixmap, QTextDocument
+from PyQt5.QtWidgets import QWidget
+
+# Mission number -> title, background asset and story
+MISSIONS = {
+    1: {
+        'title': "Mission 1: The Awakening",
+        'background': 'mission1_background',
+        'story': """
+        <p><span style='color:#FFCC00; font-size:19px; font-weight:bold;'>Zeta Galaxy, a desolate planet called Xyra-9...</span></p>
+        <p>The cosmic serpent Nova awoke, its glowing eyes scanning the alien terrain. Its memory was blank—only a faint voice echoed in its mind:</p>
+        <p><span style='color:#AAAAFF; font-style:italic; font-size:15px;'>"Wake up... You are the last survivor..."</span></p>
+        <p>Beneath Nova lay a surface of celestial rocks, shimmering in hues of red and blue. Scattered across the land were crystals pulsating with an unknown energy. Yet, some of them emitted a strange red glow...</p>
+        <p><span style='color:#FF0000; font-size:17px; font-weight:bold;'>WARNING: Oxygen levels at 80% and dropping!</span></p>
+        <p><span style='color:#FFCC00; font-size:19px; font-weight:bold;'>Mission:</span></p>
+        <ul>
+        <li>Collect the green crystals to restore energy and strengthen your body.</li>
+        <li>Avoid the red crystals! They are toxic and will weaken you for a short time.</li>
+        <li>Navigate through the alien cliffs and uncover the truth that awaits you...</li>
+        </ul>
+        """,
+    },
+}
+
+# Layout of the intro screen, in logical pixels
+MARGIN = 11
+TITLE_TOP = 20
+TITLE_HEIGHT = 50
+STORY_PADDING = 40
+BUTTON_AREA = 20 + 70 + 10  # Spacing, Next button, spacing
+
+# Shown when the background image is missing
+FALLBACK_COLOR = QColor("#780000")
+
+
+def render_intro(mission, background, width, height, dpr=1.0):
+    """The intro of a mission at width x height logical pixels, as a QImage"""
+    info = MISSIONS[mission]
+    image = QImage(round(width * dpr), round(height * dpr), QImage.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(dpr)
+    image.fill(FALLBACK_COLOR)
+
+    qp = QPainter(image)
+    qp.setRenderHint(QPainter.Antialiasing)
+    if not background.isNull():
+        # Cover the screen, cropping whatever sticks out to the right or bottom
+        scaled = background.scaled(image.width(), image.height(), Qt.KeepAspectRatioByExpanding,
+                                   Qt.SmoothTransformation)
+        scaled.setDevicePixelRatio(dpr)
+        qp.drawImage(0, 0, scaled)
+
+    # Title with golden color
+    qp.setPen(QColor("#FFCC00"))
+    qp.setFont(QFont("Courier", 30, QFont.Bold))
+    qp.drawText(QRectF(MARGIN, TITLE_TOP, width - 2 * MARGIN, TITLE_HEIGHT), Qt.AlignCenter, info['title'])
+
+    # Story on a translucent rounded box
+    box = QRectF(MARGIN, TITLE_TOP + TITLE_HEIGHT + 10, width - 2 * MARGIN,
+                 height - TITLE_TOP - TITLE_HEIGHT - 10 - BUTTON_AREA - MARGIN)
+    path = QPainterPath()
+    path.addRoundedRect(box, 15, 15)
+    qp.fillPath(path, QColor(0, 0, 0, 180))
+
+    story = QTextDocument()
+    story.setDefaultStyleSheet("body { color: #00FF00; font-family: Courier; font-size: 15px; }")
+    story.setHtml(f"<body>{info['story']}</body>")
+    story.setTextWidth(box.width() - 2 * STORY_PADDING)
+    qp.save()
+    qp.translate(box.left() + STORY_PADDING, box.top() + STORY_PADDING)
+    clip = QRectF(0, 0, box.width() - 2 * STORY_PADDING, box.height() - 2 * STORY_PADDING)
+    story.drawContents(qp, clip)
+    qp.restore()
+    qp.end()
+    return image
+
+
+class IntroRenderer(QObject):
+    """Renders mission intros on a worker thread, each size at most once"""
+
+    # Emitted (queued to the GUI thread) with the mission of each rendered intro
+    rendered = pyqtSignal(int)
+
+    def __init__(self, assets):
+        super().__init__()
+        self.assets = assets
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='intro')
+        self.futures = {}
+
+    def prefetch(self, mission, width, height, dpr=1.0):
+        """Future for the rendered intro; queues the rendering on first request"""
+        key = (mission, width, height, dpr)
+        future = self.futures.get(key)
+        if future is None:
+            # A background still decoding on the asset pool is waited for by the worker
+            name = MISSIONS[mission]['background']
+            background = self.assets.image(name)
+            pending = None
+            if background.isNull() and name in self.assets.manifest:
+                pending = self.assets.request(name)
+            future = self.pool.submit(self._render, mission, background, pending, width, height, dpr)
+            future.add_done_callback(lambda _: self.rendered.emit(mission))
+            self.futures[key] = future
+        return future
+
+    def image(self, mission, width, height, dpr=1.0):
+        """The rendered intro, waiting for it if it is not ready yet"""
+        return self.prefetch(mission, width, height, dpr).result()
+
+    def background_missing(self, mission):
+        """Whether the mission's background failed to load"""
+        return self.assets.image(MISSIONS[mission]['background'], wait=True).isNull()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _render(self, mission, background, pending, width, height, dpr):
+        if pending is not None:
+            background = pending.result()
+        return render_intro(mission, background, width, height, dpr)
+
+
+class IntroScreen(QWidget):
+    """Draws a pre-rendered intro under its child widgets"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.picture = QPixmap()
+        self.picture_key = None
+
+    def set_picture(self, key, image):
+        """Show a rendered intro; key identifies it so it is converted only once"""
+        if key != self.picture_key:
+            self.picture = QPixmap.fromImage(image)
+            self.picture_key = key
+            self.update()
+
+    def paintEvent(self, event):
+        qp = QPainter(self)
+        if self.picture.isNull():
+            qp.fillRect(self.rect(), FALLBACK_COLOR)
+        else:
+            qp.drawPixmap(0, 0, self.picture)
@@ -0,0 +1,299 @@
+"""Compact replays: the seed, the settings and the turns, plus keyframes.
+
+Every game runs on its own random stream (GameState.reseed), and the
+engine advances only on ticks, so a game is fully determined by its seed,
+how it was started and the direction the snake moved in on each tick.
+A replay stores just the ticks where that direction changed, as varints
+of (ticks since the previous change) << 2 | direction, which comes to a
+byte or two per turn: a whole game fits in a few hundred bytes.
+
+To seek without re-simulating from the start, a keyframe (a snapshot,
+see snapshot.py) is stored every keyframe_interval ticks, with an index
+of them at the end of the file. Seeking restores the nearest keyframe at
+or before the target and simulates fewer than keyframe_interval ticks,
+however long the game ran.
+
+Layout, all numbers unsigned LEB128 varints unless noted:
+
+    MAGIC, version
+    seed, width, height, boulder_variants
+    mode, boulder_count, level, keyframe_interval
+    number of turns, then the turns
+    final tick, final score, CRC32 of the final state
+    the keyframes
+    index: number of keyframes, then (tick, offset, length) of each
+    offset of the index, as a little-endian uint64
+
+The final state checksum lets playback prove it was bit-exact. Playback
+steps a headless GameState as fast as it can and draws nothing:
+
+    python replay.py data_score/last_game.replay
+"""
+import bisect
+import os
+import struct
+import sys
+import time
+import zlib
+
+import snapshot
+from snake_engine import GameState, UP, DOWN, LEFT, RIGHT
+
+MAGIC = b'SNKR'
+VERSION = 2
+
+# Ticks between keyframes: about a minute of play, a few ms to simulate
+KEYFRAME_INTERVAL = 600
+
+INDEX_OFFSET = struct.Struct('<Q')
+
+# Direction codes, two bits each
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# How the game was started
+CASUAL = 0
+LEVEL = 1
+MISSION = 2
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    """Decode the varint at offset; returns (value, offset after it)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def state_checksum(engine):
+    """CRC32 of everything a replay must reproduce"""
+    crc = zlib.crc32(engine.grid)
+    crc = zlib.crc32(repr((list(engine.snake), engine.direction, engine.food, engine.score, engine.tick,
+                           engine.boulders, engine.red_crystal_positions, float(engine.oxygen_level),
+                           engine.golden_apple_active, engine.golden_apple_current_time,
+                           engine.slow_effect_remaining, engine.game_over)).encode(), crc)
+    return crc
+
+
+def start_game(engine, mode, seed, boulder_count=0, level=0):
+    """Start a game on engine exactly as the game window does"""
+    if mode == MISSION:
+        engine.start_mission(seed=seed)
+    else:
+        engine.reset(boulder_count=boulder_count, seed=seed)
+        if mode == LEVEL:
+            engine.configure_level(level)
+
+
+class ReplayRecorder:
+    """Records the turns of the game running on an engine
+
+    Create it right after the game started and call record() after every
+    step. boulder_count is what the game was reset with, before a level
+    changed it.
+    """
+
+    def __init__(self, engine, mode, boulder_count=0, level=0, keyframe_interval=KEYFRAME_INTERVAL):
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = []  # (tick, snapshot)
+        self.seed = engine.seed
+        self.mode = mode
+        self.boulder_count = boulder_count
+        self.level = level
+        self.turns = []  # (tick, direction code)
+        self.direction = engine.direction
+
+    def record(self):
+        engine = self.engine
+        if engine.direction != self.direction:
+            self.direction = engine.direction
+            self.turns.append((engine.tick, DIRECTION_CODES[engine.direction]))
+        if engine.tick % self.keyframe_interval == 0 and engine.tick and not engine.game_over:
+            if not self.keyframes or self.keyframes[-1][0] != engine.tick:
+                self.keyframes.append((engine.tick, snapshot.dump(engine)))
+
+    @classmethod
+    def resume(cls, engine, data):
+        """Recorder continuing a replay; engine is at the replay's final tick"""
+        replay = Replay(data)
+        recorder = cls(engine, replay.mode, replay.boulder_count, replay.level,
+                       replay.keyframe_interval)
+        recorder.seed = replay.seed
+        recorder.turns = [(tick, DIRECTION_CODES[direction]) for tick, direction in replay.turns]
+        recorder.keyframes = [(tick, data[start:start + length])
+                              for tick, (start, length) in zip(replay.keyframe_ticks, replay.keyframe_spans)]
+        return recorder
+
+    def rewind(self):
+        """Forget what was recorded after the engine's current tick, after a restore"""
+        tick = self.engine.tick
+        self.turns = [turn for turn in self.turns if turn[0] <= tick]
+        self.keyframes = [keyframe for keyframe in self.keyframes if keyframe[0] <= tick]
+        self.direction = self.engine.direction
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        write_varint(out, VERSION)
+        engine = self.engine
+        for value in (self.seed, engine.width, engine.height, engine.boulder_variants,
+                      self.mode, self.boulder_count, self.level, self.keyframe_interval):
+            write_varint(out, value)
+
+        write_varint(out, len(self.turns))
+        previous = 0
+        for tick, code in self.turns:
+            write_varint(out, (tick - previous) << 2 | code)
+            previous = tick
+
+        write_varint(out, engine.tick)
+        write_varint(out, engine.score)
+        write_varint(out, state_checksum(engine))
+
+        index = []
+        for tick, data in self.keyframes:
+            index.append((tick, len(out), len(data)))
+            out += data
+
+        index_offset = len(out)
+        write_varint(out, len(index))
+        for entry in index:
+            for value in entry:
+                write_varint(out, value)
+        out += INDEX_OFFSET.pack(index_offset)
+        return bytes(out)
+
+    def save(self, path):
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as f:
+            f.write(self.to_bytes())
+        os.replace(temporary_path, path)
+
+
+class Replay:
+    """A recorded game, ready to be played back"""
+
+    def __init__(self, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError('not a replay')
+        version, offset = read_varint(data, len(MAGIC))
+        if version != VERSION:
+            raise ValueError(f'unsupported replay version {version}')
+
+        header = []
+        for _ in range(8):
+            value, offset = read_varint(data, offset)
+            header.append(value)
+        (self.seed, self.width, self.height, self.boulder_variants,
+         self.mode, self.boulder_count, self.level, self.keyframe_interval) = header
+
+        count, offset = read_varint(data, offset)
+        self.turns = []
+        tick = 0
+        for _ in range(count):
+            value, offset = read_varint(data, offset)
+            tick += value >> 2
+            self.turns.append((tick, DIRECTIONS[value & 3]))
+
+        self.final_tick, offset = read_varint(data, offset)
+        self.final_score, offset = read_varint(data, offset)
+        self.checksum, offset = read_varint(data, offset)
+        self.turn_ticks = [tick for tick, _ in self.turns]
+
+        # Only the index is read here; keyframes are sliced out when seeked to
+        self.data = data
+        self.keyframe_ticks = []
+        self.keyframe_spans = []
+        offset = INDEX_OFFSET.unpack_from(data, len(data) - INDEX_OFFSET.size)[0]
+        count, offset = read_varint(data, offset)
+        for _ in range(count):
+            tick, offset = read_varint(data, offset)
+            start, offset = read_varint(data, offset)
+            length, offset = read_varint(data, offset)
+            self.keyframe_ticks.append(tick)
+            self.keyframe_spans.append((start, length))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def new_engine(self):
+        """A GameState at tick 0 of this replay"""
+        engine = GameState(self.width, self.height, boulder_variants=self.boulder_variants)
+        start_game(engine, self.mode, self.seed, self.boulder_count, self.level)
+        return engine
+
+    def play(self, until_tick=None, engine=None):
+        """Simulate the game up to until_tick (the end by default) and return the engine
+
+        Nothing is drawn: this runs at engine speed. An engine already part
+        way into this replay can be passed to continue from where it is.
+        """
+        if engine is None:
+            engine = self.new_engine()
+        if until_tick is None:
+            until_tick = self.final_tick
+
+        turns = self.turns
+        index = bisect.bisect_right(self.turn_ticks, engine.tick)
+        while engine.tick < until_tick and not engine.game_over:
+            if index < len(turns) and turns[index][0] == engine.tick + 1:
+                # The direction the snake moved in on that tick, however it got there
+                engine.direction = turns[index][1]
+                index += 1
+            engine.step()
+        return engine
+
+    def seek(self, tick, engine=None):
+        """The engine as it was after tick, from the nearest keyframe before it
+
+        engine, if given, must be on a board of this replay's size; it is
+        reused instead of building a new one.
+        """
+        tick = min(tick, self.final_tick)
+        i = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        if i < 0:
+            return self.play(tick)
+
+        if engine is None:
+            engine = GameState(self.width, self.height, boulder_variants=self.boulder_variants)
+        start, length = self.keyframe_spans[i]
+        snapshot.restore(engine, self.data[start:start + length])
+        return self.play(tick, engine)
+
+    def verify(self):
+        """Whether playing back reproduces the recorded final state exactly"""
+        engine = self.play()
+        return (engine.tick == self.final_tick and engine.score == self.final_score
+                and state_checksum(engine) == self.checksum)
+
+
+def main(argv):
+    if len(argv) != 1:
+        print('usage: python replay.py REPLAY_FILE')
+        return 2
+    replay = Replay.load(argv[0])
+    start = time.perf_counter()
+    exact = replay.verify()
+    elapsed = time.perf_counter() - start
+    print(f'{replay.final_tick} ticks, score {replay.final_score}, {len(replay.turns)} turns')
+    print(f'played back in {elapsed * 1000:.1f} ms ({replay.final_tick / max(elapsed, 1e-9):,.0f} ticks/s): '
+          f'{"bit-exact" if exact else "MISMATCH"}')
+    return 0 if exact else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
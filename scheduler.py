@@ -0,0 +1,176 @@
+"""Single-clock scheduler for the game's timers.
+
+Every periodic or one-shot callback in the game is a Timer owned by one
+Scheduler. The scheduler keeps pending deadlines in a heap and tells its
+host whenever the earliest one changes, so the window needs only a single
+QTimer to drive everything. Timers can belong to a group; pausing a group
+freezes the time left on each of its timers and resuming continues from
+there. Nothing in here imports Qt.
+"""
+import heapq
+import time
+
+
+class Timer:
+    """A callback that fires once or repeatedly on a Scheduler
+
+    Created once and started/stopped as often as needed, like a QTimer.
+    """
+
+    def __init__(self, scheduler, callback, interval=0, single_shot=False, group=None):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.interval = interval  # Milliseconds
+        self.single_shot = single_shot
+        self.group = group
+
+        self.deadline = None   # Scheduler time of the next shot, None when not armed
+        self.remaining = None  # Time left while the timer's group is paused
+        self.generation = 0    # Bumped on every (re)arm so stale heap entries are skipped
+
+    def start(self, interval=None):
+        """(Re)start the timer, optionally with a new interval"""
+        if interval is not None:
+            self.interval = interval
+        self.scheduler._arm(self, self.interval)
+
+    def stop(self):
+        self.scheduler._disarm(self)
+
+    def is_active(self):
+        return self.deadline is not None or self.remaining is not None
+
+    def set_interval(self, interval):
+        """Change the interval; an active timer restarts with it"""
+        self.interval = interval
+        if self.is_active():
+            self.start()
+
+
+class Scheduler:
+    """Heap of timer deadlines on one monotonic clock"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.timers = []
+        self.paused_groups = set()
+        self.heap = []
+        self.sequence = 0  # Tie-breaker so equal deadlines fire in arming order
+
+        # Called with the earliest deadline (or None) whenever it may have changed
+        self.on_reschedule = None
+        self.dispatching = False
+
+        # Number of times run_due was called
+        self.wakeups = 0
+
+    def now(self):
+        """Current scheduler time in milliseconds"""
+        return self.clock() * 1000
+
+    def mark(self):
+        """Snapshot for measuring the wakeup rate with wakeups_per_second"""
+        return (self.now(), self.wakeups)
+
+    def wakeups_per_second(self, mark):
+        """Average wakeups per second since a mark; 0 when fully idle"""
+        start, wakeups = mark
+        elapsed = self.now() - start
+        return (self.wakeups - wakeups) * 1000 / elapsed if elapsed > 0 else 0.0
+
+    def timer(self, callback, interval=0, single_shot=False, group=None):
+        """Create a stopped Timer owned by this scheduler"""
+        timer = Timer(self, callback, interval, single_shot, group)
+        self.timers.append(timer)
+        return timer
+
+    def _arm(self, timer, delay):
+        timer.generation += 1
+        if timer.group in self.paused_groups:
+            # Starts counting down when the group resumes
+            timer.deadline = None
+            timer.remaining = delay
+        else:
+            timer.remaining = None
+            self._push(timer, self.now() + delay)
+        self._notify()
+
+    def _disarm(self, timer):
+        if timer.is_active():
+            timer.generation += 1
+            timer.deadline = None
+            timer.remaining = None
+            self._notify()
+
+    def _push(self, timer, deadline):
+        timer.deadline = deadline
+        heapq.heappush(self.heap, (deadline, self.sequence, timer.generation, timer))
+        self.sequence += 1
+
+    def next_deadline(self):
+        """Earliest pending deadline, or None when no timer is armed"""
+        heap = self.heap
+        # Drop entries of timers that were stopped or restarted since
+        while heap and heap[0][2] != heap[0][3].generation:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_due(self):
+        """Fire every timer whose deadline has passed"""
+        self.wakeups += 1
+        self.dispatching = True
+        try:
+            now = self.now()
+            heap = self.heap
+            while heap and heap[0][0] <= now:
+                deadline, _, generation, timer = heapq.heappop(heap)
+                if generation != timer.generation:
+                    continue
+
+                if timer.single_shot:
+                    timer.generation += 1
+                    timer.deadline = None
+                else:
+                    # Keep a steady cadence; after a stall skip the missed shots
+                    next_deadline = deadline + max(timer.interval, 1)
+                    if next_deadline <= now:
+                        next_deadline = now + max(timer.interval, 1)
+                    self._push(timer, next_deadline)
+
+                # The callback may stop or restart this or any other timer
+                timer.callback()
+        finally:
+            self.dispatching = False
+        self._notify()
+
+    def pause(self, group):
+        """Freeze every timer in a group, keeping the time each had left"""
+        if group in self.paused_groups:
+            return
+        self.paused_groups.add(group)
+
+        now = self.now()
+        for timer in self.timers:
+            if timer.group == group and timer.deadline is not None:
+                timer.generation += 1
+                timer.remaining = max(timer.deadline - now, 0)
+                timer.deadline = None
+        self._notify()
+
+    def resume(self, group):
+        """Restart the timers of a paused group where they left off"""
+        if group not in self.paused_groups:
+            return
+        self.paused_groups.discard(group)
+
+        now = self.now()
+        for timer in self.timers:
+            if timer.group == group and timer.remaining is not None:
+                remaining = timer.remaining
+                timer.remaining = None
+                self._push(timer, now + remaining)
+        self._notify()
+
+    def _notify(self):
+        if self.on_reschedule is not None and not self.dispatching:
+            self.on_reschedule(self.next_deadline())
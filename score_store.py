@@ -0,0 +1,281 @@
+"""Crash-safe score history on SQLite.
+
+Every finished game is one row, written in a single transaction, so a
+crash can lose at most the game being saved and never the scores before
+it. The database runs in WAL mode: a commit appends to the write-ahead
+log instead of rewriting the file, and readers never wait on a writer.
+
+Leaderboard queries go through indexes, and a per-mode histogram of
+scores (kept up to date by triggers) answers percentile questions by
+summing a few hundred buckets instead of counting millions of games.
+
+ScoreWriter does the writing on a background thread, so the game-over
+screen never waits on the disk. Other files saved at game over, like the
+replay, go through the same thread.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Bumped whenever the schema changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Column order of the tuples passed to record_games
+GAME_COLUMNS = ('score', 'mode', 'level', 'boulders', 'duration', 'crystals', 'played_at')
+
+
+class ScoreStore:
+    """Score history in an SQLite database"""
+
+    def __init__(self, path, legacy_json=None):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        try:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            # FULL makes every commit durable, at one fsync per game
+            self.connection.execute('PRAGMA synchronous=FULL')
+            self._migrate(legacy_json)
+        except BaseException:
+            # Not a database, or not ours: don't keep the file open
+            self.connection.close()
+            raise
+
+    def _migrate(self, legacy_json):
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        # One explicit transaction, so a crash never leaves a half-migrated schema
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if version < 1:
+                connection.execute('''
+                    CREATE TABLE IF NOT EXISTS games (
+                        id INTEGER PRIMARY KEY,
+                        score INTEGER NOT NULL,
+                        played_at REAL NOT NULL
+                    )''')
+                connection.execute('CREATE INDEX IF NOT EXISTS games_score ON games (score)')
+
+                # Carry over the scores from the old JSON file, once
+                if legacy_json is not None:
+                    for score in self._read_legacy_scores(legacy_json):
+                        connection.execute('INSERT INTO games (score, played_at) VALUES (?, ?)',
+                                           (score, 0))
+
+            if version < 2:
+                # Full game details; games from before this version count as casual
+                connection.execute("ALTER TABLE games ADD COLUMN mode TEXT NOT NULL DEFAULT 'casual'")
+                connection.execute('ALTER TABLE games ADD COLUMN level INTEGER')
+                connection.execute('ALTER TABLE games ADD COLUMN boulders INTEGER')
+                connection.execute('ALTER TABLE games ADD COLUMN duration REAL')
+                connection.execute('ALTER TABLE games ADD COLUMN crystals INTEGER')
+                connection.execute('CREATE INDEX games_mode_score ON games (mode, score)')
+
+                # Number of games per (mode, score)
+                connection.execute('''
+                    CREATE TABLE score_counts (
+                        mode TEXT NOT NULL,
+                        score INTEGER NOT NULL,
+                        runs INTEGER NOT NULL,
+                        PRIMARY KEY (mode, score)
+                    ) WITHOUT ROWID''')
+                connection.execute('''
+                    INSERT INTO score_counts (mode, score, runs)
+                    SELECT mode, score, COUNT(*) FROM games GROUP BY mode, score''')
+                connection.execute('''
+                    CREATE TRIGGER games_counted AFTER INSERT ON games BEGIN
+                        INSERT INTO score_counts (mode, score, runs) VALUES (NEW.mode, NEW.score, 1)
+                        ON CONFLICT (mode, score) DO UPDATE SET runs = runs + 1;
+                    END''')
+                connection.execute('''
+                    CREATE TRIGGER games_uncounted AFTER DELETE ON games BEGIN
+                        UPDATE score_counts SET runs = runs - 1
+                        WHERE mode = OLD.mode AND score = OLD.score;
+                    END''')
+
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+    def _read_legacy_scores(self, path):
+        """Scores kept by the JSON file, including a high score no longer in its list"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(data, dict):
+            return []
+
+        scores = [s for s in data.get('scores', []) if isinstance(s, int) and s > 0]
+        high_score = data.get('high_score', 0)
+        if isinstance(high_score, int) and high_score > max(scores, default=0):
+            scores.append(high_score)
+        return scores
+
+    def record_game(self, score, mode='casual', level=None, boulders=0, duration=0.0,
+                    crystals=None, played_at=None):
+        """Durably add a finished game; duration is in seconds"""
+        if played_at is None:
+            played_at = time.time()
+        self.record_games([(score, mode, level, boulders, duration, crystals, played_at)])
+
+    def record_games(self, games):
+        """Durably add games, as tuples in GAME_COLUMNS order, in a single transaction"""
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT INTO games ({", ".join(GAME_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)', games)
+
+    def high_score(self):
+        """Best score ever recorded, 0 if there is none"""
+        row = self.connection.execute('SELECT MAX(score) FROM games').fetchone()
+        return row[0] or 0
+
+    def best_score(self, mode):
+        """Best score recorded in a mode, 0 if there is none"""
+        row = self.connection.execute('SELECT MAX(score) FROM games WHERE mode = ?', (mode,)).fetchone()
+        return row[0] or 0
+
+    def top_scores(self, n=10, mode=None):
+        """The n best games, best first, as (score, mode, level, played_at) rows"""
+        if mode is None:
+            return self.connection.execute(
+                'SELECT score, mode, level, played_at FROM games ORDER BY score DESC LIMIT ?',
+                (n,)).fetchall()
+        return self.connection.execute(
+            'SELECT score, mode, level, played_at FROM games WHERE mode = ? ORDER BY score DESC LIMIT ?',
+            (mode, n)).fetchall()
+
+    def percentile(self, score, mode=None):
+        """Percentage of recorded games that scored lower, None if there are none"""
+        query = 'SELECT SUM(runs), SUM(CASE WHEN score < ? THEN runs ELSE 0 END) FROM score_counts'
+        if mode is None:
+            total, lower = self.connection.execute(query, (score,)).fetchone()
+        else:
+            total, lower = self.connection.execute(query + ' WHERE mode = ?', (score, mode)).fetchone()
+        if not total:
+            return None
+        return 100 * lower / total
+
+    def close(self):
+        self.connection.close()
+
+
+class ScoreWriter:
+    """Queue of finished games saved by a worker thread
+
+    The worker owns its own connection. Games queued while it is busy are
+    written together in one transaction, so back-to-back saves cost a
+    single commit. on_error is called on the worker thread with the
+    exception when a batch or a file can't be written, or when the
+    database can't be opened at all; after that, games are no longer
+    accepted, but files still are.
+
+    on_recorded, also called on the worker thread, gets the token of each
+    saved game and the percentage of earlier games in its mode that
+    scored lower (None for the first one), so the game over screen never
+    queries the database itself.
+    """
+
+    def __init__(self, path, on_error=None, on_recorded=None):
+        self.path = path
+        self.on_error = on_error
+        self.on_recorded = on_recorded
+        self.pending = []  # (game in GAME_COLUMNS order, token)
+        self.files = []  # (path, data) to write
+        self.writing = False
+        self.closing = False
+        self.error = None  # Set when the database could not be opened
+        self.condition = threading.Condition()
+
+        self.thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+        self.thread.start()
+
+    def record_game(self, score, mode='casual', level=None, boulders=0, duration=0.0, crystals=None,
+                    token=None):
+        """Queue a finished game; returns immediately. token is passed to on_recorded"""
+        with self.condition:
+            if self.error is not None:
+                return
+            self.pending.append(((score, mode, level, boulders, duration, crystals, time.time()), token))
+            self.condition.notify_all()
+
+    def write_file(self, path, data):
+        """Queue bytes to be written to path, atomically; returns immediately"""
+        with self.condition:
+            self.files.append((path, data))
+            self.condition.notify_all()
+
+    def flush(self):
+        """Wait until every queued game and file has been written"""
+        with self.condition:
+            while self.pending or self.files or self.writing:
+                self.condition.wait()
+
+    def close(self):
+        """Write what is queued, then stop the worker"""
+        if self.thread is None:
+            return
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.thread = None
+
+    def _run(self):
+        try:
+            store = ScoreStore(self.path)
+        except sqlite3.Error as e:
+            # Drop the games queued so flush() returns, and refuse what follows
+            store = None
+            with self.condition:
+                self.error = e
+                self.pending = []
+                self.condition.notify_all()
+            if self.on_error is not None:
+                self.on_error(e)
+
+        while True:
+            with self.condition:
+                while not self.pending and not self.files and not self.closing:
+                    self.condition.wait()
+                if not self.pending and not self.files:
+                    break
+                batch, self.pending = self.pending, []
+                files, self.files = self.files, []
+                self.writing = True
+
+            if batch:
+                try:
+                    # Ranked before they are added, among the games saved earlier
+                    if self.on_recorded is not None:
+                        percentiles = [store.percentile(game[0], game[1]) for game, _ in batch]
+                    store.record_games([game for game, _ in batch])
+                except sqlite3.Error as e:
+                    if self.on_error is not None:
+                        self.on_error(e)
+                else:
+                    if self.on_recorded is not None:
+                        for (_, token), percentile in zip(batch, percentiles):
+                            self.on_recorded(token, percentile)
+            for path, data in files:
+                try:
+                    temporary_path = path + '.tmp'
+                    with open(temporary_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(temporary_path, path)
+                except OSError as e:
+                    if self.on_error is not None:
+                        self.on_error(e)
+
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+        if store is not None:
+            store.close()
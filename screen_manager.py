@@ -0,0 +1,111 @@
+"""Screens on a QStackedWidget, each built the first time it is shown.
+
+A screen is registered with a builder that returns its widget. The
+builder runs on the first visit only; after that switching screens is a
+single setCurrentIndex, and the widget tree stays the same size however
+often the player goes back and forth.
+
+Run this file to benchmark screen transitions in the real game window:
+
+    python screen_manager.py --rounds 50
+
+It cycles through the menus, repaints the window after every switch, and
+fails if revisiting screens created widgets. The window gets a temporary
+data directory, so the player's scores and saved game are left alone.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+
+from PyQt5.QtWidgets import QStackedWidget, QWidget
+
+
+class ScreenManager(QStackedWidget):
+    """Named screens, built lazily and kept for reuse"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.builders = {}
+        self.indexes = {}
+        self.current_name = None
+
+        # Milliseconds spent in each show(), building included
+        self.transition_times = deque(maxlen=256)
+
+    def register(self, name, builder):
+        """Add a screen; builder() returns its widget and is called on first use"""
+        self.builders[name] = builder
+
+    def screen(self, name):
+        """The screen's widget, building it if this is its first use"""
+        index = self.indexes.get(name)
+        if index is None:
+            index = self.addWidget(self.builders[name]())
+            self.indexes[name] = index
+        return self.widget(index)
+
+    def is_built(self, name):
+        return name in self.indexes
+
+    def show_screen(self, name):
+        start = time.perf_counter()
+        self.setCurrentWidget(self.screen(name))
+        self.current_name = name
+        self.transition_times.append((time.perf_counter() - start) * 1000)
+
+    def widget_count(self):
+        """Number of widgets under the stack"""
+        return len(self.findChildren(QWidget))
+
+
+def benchmark(game, rounds):
+    """Time a cycle through the menus, repainting after each switch
+
+    Returns the transition times in ms and the widget count after the
+    first and the last round.
+    """
+    cycle = [game.show_settings, game.show_main_menu, game.show_game_mode_menu,
+             game.start_campaign_game, game.show_mission_intro, game.start_campaign_game,
+             game.show_game_mode_menu, game.show_main_menu]
+    times = []
+    counts = []
+    for _ in range(rounds):
+        for transition in cycle:
+            start = time.perf_counter()
+            transition()
+            game.repaint()
+            times.append((time.perf_counter() - start) * 1000)
+        counts.append(len(game.findChildren(QWidget)))
+    return times, counts[0], counts[-1]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Benchmark screen transitions')
+    parser.add_argument('--rounds', type=int, default=20, help='times to cycle through the menus')
+    args = parser.parse_args(argv)
+
+    from PyQt5.QtWidgets import QApplication
+    from snake_game import SnakeGame
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as data_dir:
+        game = SnakeGame(data_dir=data_dir)
+        app.processEvents()
+        times, first_count, last_count = benchmark(game, args.rounds)
+        game.close()
+
+    times.sort()
+    print(f'{len(times)} transitions: median {statistics.median(times):.2f} ms, '
+          f'p95 {times[int(len(times) * 0.95)]:.2f} ms, max {times[-1]:.2f} ms')
+    print(f'widgets after first round {first_count}, after last round {last_count}')
+    if last_count > first_count:
+        print('FAIL: revisiting screens created widgets')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
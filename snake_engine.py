@@ -0,0 +1,596 @@
+"""Headless game rules for Snake.
+
+Nothing in this module imports Qt, so a GameState can be stepped by bots,
+balancing scripts and regression tests on machines without a display.
+SnakeGame in snake_game.py is a view that draws a GameState and feeds it
+input and ticks.
+"""
+import random
+from array import array
+from collections import deque
+
+MASK64 = (1 << 64) - 1
+
+# Movement directions
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+# Keep 2 cells from the top for score display
+MARGIN_TOP = 2
+
+# Cell types in the occupancy grid
+EMPTY = 0
+SNAKE = 1
+BOULDER = 2
+FOOD = 3
+RED_CRYSTAL = 4
+
+# Events reported by GameState.step()
+FOOD_EATEN = 'food_eaten'
+RED_CRYSTAL_EATEN = 'red_crystal_eaten'
+GOLDEN_APPLE_EXPIRED = 'golden_apple_expired'
+SLOW_EFFECT_ENDED = 'slow_effect_ended'
+OXYGEN_LOW = 'oxygen_low'
+OXYGEN_RESTORED = 'oxygen_restored'
+GAME_OVER = 'game_over'
+
+# Tick interval (ms) and boulder count for each campaign level
+LEVELS = {
+    1: (120, 2),  # Slower speed for level 1
+    2: (115, 3),
+    3: (110, 4),
+    4: (105, 5),
+    5: (100, 6),
+    6: (90, 7),   # Fastest speed for level 6
+}
+
+
+class CellIndex:
+    """Set of cell indices with O(1) add, discard and uniform random choice
+
+    Cells live in a dense list; each cell remembers its slot in that list so
+    removal can swap the last cell into the hole.
+    """
+
+    def __init__(self, size, cells=()):
+        self.cells = list(cells)
+        self.slots = array('l', [-1]) * size
+        for slot, cell in enumerate(self.cells):
+            self.slots[cell] = slot
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.slots[cell] >= 0
+
+    def add(self, cell):
+        if self.slots[cell] < 0:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        slot = self.slots[cell]
+        if slot >= 0:
+            last = self.cells.pop()
+            if last != cell:
+                self.cells[slot] = last
+                self.slots[last] = slot
+            self.slots[cell] = -1
+
+    def choice(self, rng):
+        """Uniformly random member; the index must not be empty"""
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class GameRandom(random.Random):
+    """random.Random on a 64-bit SplitMix64 generator
+
+    Its whole state is one integer, so a snapshot of a game can carry the
+    exact position of its random stream in eight bytes.
+    """
+
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = random.getrandbits(64)
+        self.state = a & MASK64
+
+    def _next(self):
+        self.state = state = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def getrandbits(self, k):
+        bits = 0
+        filled = 0
+        while filled < k:
+            bits |= self._next() << filled
+            filled += 64
+        return bits & ((1 << k) - 1)
+
+    def random(self):
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
+
+
+class GameState:
+    """State and rules of a single game, advanced one tick at a time"""
+
+    def __init__(self, width, height, boulder_variants=9, rng=None):
+        self.width = width
+        self.height = height
+        self.boulder_variants = boulder_variants  # Number of boulder images the view can draw
+        # Every game gets its own random stream, seeded from this one, so a
+        # game can be reproduced from its seed
+        self.seed_source = rng if rng is not None else random
+        self.reseed()
+
+        # Obstacles
+        self.obstacles_enabled = True
+        self.boulder_count = 9
+        self.boulders = []  # List of (cells, image index)
+        self.boulder_version = 0  # Bumped whenever boulders change, for view caches
+
+        # Golden apple settings
+        self.golden_apple_active = False
+        self.apples_eaten = 0
+        self.golden_apple_timer_value = 5
+        self.golden_apple_current_time = self.golden_apple_timer_value
+        self.golden_apple_elapsed = 0
+        self.golden_apple_spawned_in_current_basket = False
+
+        # Mission state
+        self.in_mission_mode = False
+        self.crystals_collected = 0
+        self.crystals_required = 20
+        self.crystal_milestones = [0, 2, 5, 10, 15]  # After these green crystals, spawn red crystals
+        self.red_crystal_positions = []
+        self.red_crystals_eaten = set()
+        self.oxygen_level = 100
+        self.oxygen_depletion_time = 90  # 90 seconds to fully deplete
+        self.oxygen_elapsed = 0
+        self.oxygen_warning_active = False
+
+        # Speed
+        self.base_interval = 100  # Milliseconds per tick
+        self.slow_effect_active = False
+        self.slow_effect_remaining = 0
+        self.slow_effect_duration = 5000  # 5 seconds
+
+        # Cells below the score display, where food and crystals may spawn
+        self.playfield_start = MARGIN_TOP * self.width
+
+        # Head first; a deque gives O(1) head push and tail pop. The same
+        # object is reused across games so views can keep a reference to it.
+        self.snake = deque()
+
+        # Cells whose contents changed during the last step, for partial repaints
+        self.changed_cells = []
+        # Cell the tail left on the last step (None if the snake grew), so a
+        # view can slide every segment from its previous cell
+        self.vacated_tail = None
+
+        # Turns requested since the last tick, applied one per tick in order,
+        # as (direction, timestamp) pairs
+        self.input_queue = deque()
+        self.max_queued_turns = 3
+        # The queued turn the last step applied, None if it applied none
+        self.applied_input = None
+
+        self._reset_common(self.base_interval)
+        self.spawn_food()
+
+    @property
+    def tick_interval(self):
+        """Milliseconds between two ticks at the current speed"""
+        if self.slow_effect_active:
+            return int(self.base_interval * 1.67)  # 40% slower
+        return self.base_interval
+
+    def reseed(self, seed=None):
+        """Start a fresh random stream for the next game; returns its seed"""
+        if seed is None:
+            seed = self.seed_source.getrandbits(64)
+        self.seed = seed
+        self.rng = GameRandom(seed)
+        return seed
+
+    def reset(self, boulder_count=None, interval=100, seed=None):
+        """Start a new casual game, on the stream of seed (a new one if None)"""
+        self.reseed(seed)
+        if boulder_count is not None:
+            self.boulder_count = boulder_count
+            self.obstacles_enabled = boulder_count > 0
+
+        self.in_mission_mode = False
+
+        self._reset_common(interval)
+        self.spawn_food()
+
+    def start_mission(self, crystals_required=20, oxygen=80, interval=122, seed=None):
+        """Start (or restart) a mission: no boulders, oxygen running out"""
+        self.reseed(seed)
+        self.in_mission_mode = True
+        self.boulder_count = 0
+        self.obstacles_enabled = False
+
+        self._reset_common(interval)
+
+        self.crystals_required = crystals_required
+        self.oxygen_level = oxygen
+
+        self.spawn_food()
+
+        # Immediately spawn two red crystals at mission start
+        self.initialize_red_crystals()
+
+    def configure_level(self, level):
+        """Configure speed and boulders for a campaign level"""
+        interval, boulder_count = LEVELS.get(level, (self.base_interval, self.boulder_count))
+        self.base_interval = interval
+        self.boulder_count = boulder_count
+        self.obstacles_enabled = True
+
+        for boulder_cells, _ in self.boulders:
+            for pos in boulder_cells:
+                self._set_cell(pos, EMPTY)
+        self.boulders = []
+        self.boulder_version += 1
+        self.place_boulders(self.food)
+
+    def _reset_common(self, interval):
+        # One byte per cell holding its type, kept in step with the entities
+        # so collisions and pickups are a single lookup
+        self.changed_cells.clear()
+        self.vacated_tail = None
+        self.input_queue.clear()
+        self.applied_input = None
+        size = self.width * self.height
+        self.grid = bytearray(size)
+        # Empty playfield cells, shared by every spawner
+        self.free_cells = CellIndex(size, range(self.playfield_start, size))
+
+        self.snake.clear()
+        self.snake.append((self.width // 2, self.height // 2))
+        self._set_cell(self.snake[0], SNAKE)
+        self.direction = RIGHT
+        self.boulders = []
+        self.boulder_version += 1
+        self.red_crystal_positions = []
+        self.score = 0
+        self.game_over = False
+        self.game_time = 0  # Milliseconds of game time played
+        self.tick = 0  # Steps taken
+
+        self.base_interval = interval
+        self.slow_effect_active = False
+        self.slow_effect_remaining = 0
+
+        self.apples_eaten = 0
+        self.golden_apple_active = False
+        self.golden_apple_spawned_in_current_basket = False
+
+        # Mission progress; a casual game after a mission must not keep it
+        self.crystals_collected = 0
+        self.red_crystals_eaten = set()
+        self.oxygen_level = 100
+        self.oxygen_elapsed = 0
+        self.oxygen_warning_active = False
+
+    def cell_at(self, pos):
+        """Type of the entity occupying a cell"""
+        return self.grid[pos[1] * self.width + pos[0]]
+
+    def _set_cell(self, pos, kind):
+        index = pos[1] * self.width + pos[0]
+        self.grid[index] = kind
+        self.changed_cells.append(pos)
+        if index >= self.playfield_start:
+            if kind == EMPTY:
+                self.free_cells.add(index)
+            else:
+                self.free_cells.discard(index)
+
+    def random_free_cell(self, margin=0):
+        """Random empty playfield cell at least margin cells from the edges, or None"""
+        free_cells = self.free_cells
+        if not free_cells:
+            return None
+
+        width = self.width
+        if not margin:
+            return divmod(free_cells.choice(self.rng), width)[::-1]
+
+        min_y = max(margin, MARGIN_TOP)
+        max_x = width - 1 - margin
+        max_y = self.height - 1 - margin
+
+        # Most of the board is inside the margin, so a few draws nearly always hit
+        for _ in range(16):
+            y, x = divmod(free_cells.choice(self.rng), width)
+            if margin <= x <= max_x and min_y <= y <= max_y:
+                return (x, y)
+
+        # Crowded board: pick among the cells that qualify
+        candidates = [cell for cell in free_cells.cells
+                      if margin <= cell % width <= max_x and min_y <= cell // width <= max_y]
+        if not candidates:
+            return None
+        y, x = divmod(self.rng.choice(candidates), width)
+        return (x, y)
+
+    def turn(self, direction):
+        """Change direction unless it would reverse the snake onto itself"""
+        if direction != (-self.direction[0], -self.direction[1]):
+            self.direction = direction
+
+    def queue_turn(self, direction, timestamp=None):
+        """Queue a turn for a coming tick; returns False if it was refused
+
+        The turn is checked against the direction the snake will have once
+        the turns already queued are applied, so two quick presses inside one
+        tick can't reverse it. timestamp is handed back in applied_input.
+        """
+        queue = self.input_queue
+        if len(queue) >= self.max_queued_turns:
+            return False
+        heading = queue[-1][0] if queue else self.direction
+        if direction == heading or direction == (-heading[0], -heading[1]):
+            return False
+        queue.append((direction, timestamp))
+        return True
+
+    def step(self, action=None):
+        """Advance the game by one tick and return the list of events
+
+        action is an optional new direction applied before moving; without
+        one the oldest queued turn is applied.
+        """
+        events = []
+        changed_cells = self.changed_cells
+        changed_cells.clear()
+        self.applied_input = None
+        if self.game_over:
+            return events
+        self.tick += 1
+
+        if action is not None:
+            self.turn(action)
+        elif self.input_queue:
+            self.applied_input = self.input_queue.popleft()
+            self.turn(self.applied_input[0])
+
+        # Time that passed since the previous tick
+        self.game_time += self.tick_interval
+        self.advance_clock(self.tick_interval, events)
+        if self.game_over:
+            return events
+
+        width = self.width
+        grid = self.grid
+        head = self.snake[0]
+        new_x = (head[0] + self.direction[0]) % width
+        new_y = (head[1] + self.direction[1]) % self.height
+        new_head = (new_x, new_y)
+        index = new_y * width + new_x
+        kind = grid[index]
+
+        # Check for collision with snake body (the tail has not moved yet) or boulders
+        if kind == SNAKE or kind == BOULDER:
+            self.game_over = True
+            events.append(GAME_OVER)
+            return events
+
+        # The old head turns into body
+        self.vacated_tail = None
+        changed_cells.append(head)
+        changed_cells.append(new_head)
+
+        self.snake.appendleft(new_head)
+        grid[index] = SNAKE
+        self.free_cells.discard(index)
+
+        if kind == FOOD:
+            self.crystals_collected += 1
+            self.score += 1
+            events.append(FOOD_EATEN)
+
+            # Check if we should spawn red crystals at this milestone
+            self.spawn_red_crystals()
+
+            self.spawn_food()
+
+        elif kind == RED_CRYSTAL:
+            # Slow down for a while; eating another one restarts the countdown
+            self.slow_effect_active = True
+            self.slow_effect_remaining = self.slow_effect_duration
+
+            self.red_crystal_positions.remove(new_head)
+            self.red_crystals_eaten.add(new_head)
+            self.score += 1
+            events.append(RED_CRYSTAL_EATEN)
+        else:
+            # No crystal eaten, remove the last segment
+            tail = self.snake.pop()
+            self.vacated_tail = tail
+            changed_cells.append(tail)
+            tail_index = tail[1] * width + tail[0]
+            grid[tail_index] = EMPTY
+            if tail_index >= self.playfield_start:
+                self.free_cells.add(tail_index)
+
+        return events
+
+    def advance_clock(self, elapsed, events):
+        """Run the second-based game timers for elapsed milliseconds"""
+        # Golden apple countdown
+        if self.golden_apple_active:
+            self.golden_apple_elapsed += elapsed
+            while self.golden_apple_active and self.golden_apple_elapsed >= 1000:
+                self.golden_apple_elapsed -= 1000
+                self.golden_apple_current_time -= 1
+                if self.golden_apple_current_time <= 0:
+                    self.golden_apple_active = False
+                    self.changed_cells.append(self.food)
+                    events.append(GOLDEN_APPLE_EXPIRED)
+
+        # Slow effect
+        if self.slow_effect_active:
+            self.slow_effect_remaining -= elapsed
+            if self.slow_effect_remaining <= 0:
+                self.slow_effect_active = False
+                self.slow_effect_remaining = 0
+                events.append(SLOW_EFFECT_ENDED)
+
+        # Oxygen depletion
+        if self.in_mission_mode:
+            self.oxygen_elapsed += elapsed
+            while not self.game_over and self.oxygen_elapsed >= 1000:
+                self.oxygen_elapsed -= 1000
+                self.update_oxygen_level(events)
+
+    def update_oxygen_level(self, events):
+        """Deplete one second worth of oxygen and handle low oxygen warnings"""
+        self.oxygen_level -= 100 / self.oxygen_depletion_time
+
+        # Ensure oxygen doesn't go below 0
+        if self.oxygen_level < 0:
+            self.oxygen_level = 0
+
+        if self.oxygen_level < 30 and not self.oxygen_warning_active:
+            self.oxygen_warning_active = True
+            events.append(OXYGEN_LOW)
+        elif self.oxygen_level >= 30 and self.oxygen_warning_active:
+            self.oxygen_warning_active = False
+            events.append(OXYGEN_RESTORED)
+
+        # If oxygen runs out, game over
+        if self.oxygen_level <= 0:
+            self.game_over = True
+            events.append(GAME_OVER)
+
+    def spawn_food(self):
+        """Create new food and mark it on the grid"""
+        self.food = self.create_food()
+        if self.cell_at(self.food) == EMPTY:
+            self._set_cell(self.food, FOOD)
+
+    def create_food(self):
+        """Pick a new food position, maybe turning it into a golden apple"""
+        # Check for golden apple spawn
+        if self.apples_eaten % 10 == 0:
+            self.golden_apple_spawned_in_current_basket = False
+
+        # Skip golden apple logic in mission mode
+        if not self.in_mission_mode:
+            if (not self.golden_apple_active and
+                    not self.golden_apple_spawned_in_current_basket and
+                    self.apples_eaten > 0 and
+                    self.rng.random() < 0.1):
+                self.golden_apple_active = True
+                self.golden_apple_spawned_in_current_basket = True
+                self.golden_apple_current_time = self.golden_apple_timer_value
+                self.golden_apple_elapsed = 0
+
+        food_pos = self.random_free_cell()
+        if food_pos is None:
+            # If no positions available, return a random position
+            return (self.rng.randint(0, self.width - 1), self.rng.randint(MARGIN_TOP, self.height - 1))
+
+        # Place boulders only in casual mode
+        if not self.in_mission_mode:
+            if self.obstacles_enabled and len(self.boulders) < self.boulder_count:
+                self.place_boulders(food_pos)
+
+        return food_pos
+
+    def place_boulders(self, food_pos):
+        """Place 2x2 boulder obstacles until boulder_count is reached or the board is full"""
+        # Skip if obstacles are disabled or we're at max boulders
+        if not self.obstacles_enabled or len(self.boulders) >= self.boulder_count or not self.boulder_variants:
+            return
+
+        anchors = self.boulder_anchors()
+
+        # Keep the food and the cell the snake will enter next free
+        head = self.snake[0]
+        next_pos = ((head[0] + self.direction[0]) % self.width,
+                    (head[1] + self.direction[1]) % self.height)
+        for x, y in (food_pos, next_pos):
+            self._discard_anchors(anchors, x, y, x, y)
+
+        while len(self.boulders) < self.boulder_count and anchors:
+            # Top-left corner of the boulder
+            y, x = divmod(anchors.choice(self.rng), self.width)
+
+            boulder_positions = [
+                (x, y),        # Top-left
+                (x + 1, y),    # Top-right
+                (x, y + 1),    # Bottom-left
+                (x + 1, y + 1) # Bottom-right
+            ]
+            self.boulders.append((boulder_positions, self.rng.randrange(self.boulder_variants)))
+            self.boulder_version += 1
+            for pos in boulder_positions:
+                self._set_cell(pos, BOULDER)
+
+            # No other boulder may overlap this one
+            self._discard_anchors(anchors, x, y, x + 1, y + 1)
+
+    def boulder_anchors(self):
+        """Index of the top-left cells where a 2x2 boulder fits on empty playfield cells
+
+        One pass over the grid: a column pair is free when both of its rows
+        are empty, and an anchor needs two free column pairs side by side.
+        """
+        width = self.width
+        grid = self.grid
+        anchors = CellIndex(width * self.height)
+        for y in range(MARGIN_TOP, self.height - 1):
+            row = y * width
+            below = row + width
+            previous_free = grid[row] == EMPTY and grid[below] == EMPTY
+            for x in range(1, width):
+                free = grid[row + x] == EMPTY and grid[below + x] == EMPTY
+                if previous_free and free:
+                    anchors.add(row + x - 1)
+                previous_free = free
+        return anchors
+
+    def _discard_anchors(self, anchors, x0, y0, x1, y1):
+        """Drop every anchor whose boulder would overlap the cells x0..x1, y0..y1"""
+        for y in range(max(y0 - 1, 0), y1 + 1):
+            for x in range(max(x0 - 1, 0), min(x1, self.width - 2) + 1):
+                anchors.discard(y * self.width + x)
+
+    def spawn_red_crystals(self):
+        """Spawn red crystals at certain milestones"""
+        if not self.in_mission_mode:
+            return
+
+        if self.crystals_collected in self.crystal_milestones:
+            # Base 2 red crystals per milestone
+            for _ in range(2):
+                self.spawn_single_red_crystal()
+
+    def initialize_red_crystals(self):
+        """Generate initial two red crystals at random positions"""
+        self.red_crystal_positions = []
+        for _ in range(2):
+            self.spawn_single_red_crystal()
+
+    def spawn_single_red_crystal(self):
+        """Generate a single red crystal at a random position"""
+        # Stay away from edges; on a full board no crystal is added
+        pos = self.random_free_cell(margin=2)
+        if pos is not None:
+            self.red_crystal_positions.append(pos)
+            self._set_cell(pos, RED_CRYSTAL)
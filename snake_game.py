@@ -1,14 +1,34 @@
+import time
+LAUNCH_TIME = time.perf_counter()  # Cold start is measured from here to the first menu frame
+
 from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QCheckBox, QLabel, QHBoxLayout, QGridLayout, QTextEdit
-from PyQt5.QtGui import QPainter, QColor, QFont, QImage, QTransform, QMovie, QPainterPath, QRegion, QPixmap, QPalette, QBrush
-from PyQt5.QtCore import Qt, QTimer, QUrl, QRect, QSize
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PyQt5.QtGui import QPainter, QColor, QFont, QMovie, QPainterPath, QRegion, QPixmap
+from PyQt5.QtCore import Qt, QTimer, QRect, QSize, pyqtSignal
 import sys
-import random
 import os
-import json
+import math
+import sqlite3
+from collections import deque
+from itertools import chain, islice
+
+from asset_manager import AssetManager, GAME_ASSETS, prepare_sprite
+from asset_pack import AssetPack
+from audio_engine import AudioEngine, NullSink, QtAudioSink, SoundLoader
+from event_log import EventLog, DEBUG, INFO, WARNING, ERROR
+from mission_intro import MISSIONS, IntroRenderer, IntroScreen
+from replay import CASUAL, LEVEL, MISSION, ReplayRecorder
+from scheduler import Scheduler
+from screen_manager import ScreenManager
+from score_store import ScoreStore, ScoreWriter
+from snake_engine import GameState, UP, DOWN, LEFT, RIGHT, MARGIN_TOP, GAME_OVER, OXYGEN_LOW, OXYGEN_RESTORED
+import snapshot
 
 class SnakeGame(QMainWindow):
-    def __init__(self):
+    # Emitted by the score writer's thread with (game number, percentile);
+    # queued to the GUI thread
+    score_ranked = pyqtSignal(object, object)
+
+    def __init__(self, data_dir=None):
         super().__init__()
         self.setWindowTitle("Snake")
         
@@ -23,8 +43,11 @@ class SnakeGame(QMainWindow):
         # Initialize high_score before calling setup_data_directory
         self.high_score = 0
         
+        # Structured event log, off unless SNAKE_EVENT_LOG names a file
+        self.event_log = EventLog.from_environment()
+        
         # Setup data directory and high score first
-        self.setup_data_directory()
+        self.setup_data_directory(data_dir)
         self.high_score = self.load_high_score()
         
         # Game grid size - adjust based on screen size
@@ -45,35 +68,34 @@ class SnakeGame(QMainWindow):
         self.obstacles_enabled = True
         self.boulder_count = 9  # Default to 9 boulders
         
-        # Initialize audio player
-        self.sound_player = QMediaPlayer()
+        # Every timer runs on one scheduler, woken by a single Qt timer
+        self.scheduler = Scheduler()
+        self.scheduler_timer = QTimer()
+        self.scheduler_timer.setSingleShot(True)
+        self.scheduler_timer.setTimerType(Qt.PreciseTimer)
+        self.scheduler_timer.timeout.connect(self.scheduler.run_due)
+        self.scheduler.on_reschedule = self.arm_scheduler_timer
+        
+        # Sound effects are decoded to PCM once and mixed on a pool of voices,
+        # so playing one never opens a file and effects overlap instead of
+        # cutting each other off; without an audio device they go to a null sink
+        self.audio = AudioEngine()
+        self.audio.set_channel_volume('effects', 0.3)
+        self.audio.set_channel_volume('ui', 0.3)
+        self.audio.set_channel_volume('alerts', 0.4)
+        self.audio.attach(QtAudioSink.create() or NullSink())
+        
         current_dir = os.path.dirname(os.path.abspath(__file__))
         sound_effect_dir = os.path.join(current_dir, 'asset', 'sound_effect')
-        self.apple_sound = QMediaContent(QUrl.fromLocalFile(os.path.join(sound_effect_dir, 'game_score.mp3')))
-        self.golden_apple_sound = QMediaContent(QUrl.fromLocalFile(os.path.join(sound_effect_dir, 'golden_apple.mp3')))
-        self.hover_sound = QMediaContent(QUrl.fromLocalFile(os.path.join(sound_effect_dir, 'hover_effect.wav')))
-        
-        # Set audio volume to a lower level
-        self.sound_player.setVolume(30)  # 30% of maximum volume
-        
-        # Timer for cutting sound effects short
-        self.sound_timer = QTimer()
-        self.sound_timer.setSingleShot(True)
-        self.sound_timer.timeout.connect(self.stop_sound)
-        
-        # More aggressive preloading with multiple attempts
-        self.sound_player.setMedia(self.apple_sound)
-        self.sound_player.setVolume(0)  # Silent during preload
-        self.sound_player.play()
-        
-        # Create a timer to check if audio system is ready
-        self.preload_attempts = 0
-        self.preload_timer = QTimer()
-        self.preload_timer.timeout.connect(self._check_audio_ready)
-        self.preload_timer.start(10)  # Check every 10ms
+        # Decoded once, then read back from the cache on later launches
+        self.sound_loader = SoundLoader(self.audio, os.path.join(current_dir, 'asset', 'sound_cache'))
+        for name, file_name in (('apple', 'game_score.mp3'), ('golden_apple', 'golden_apple.mp3'),
+                                ('hover', 'hover_effect.wav'), ('oxygen', 'oxygen.mp3')):
+            self.sound_loader.load(name, os.path.join(sound_effect_dir, file_name))
         
         # Main menu state
         self.in_main_menu = True
+        self.cold_start_ms = None  # Launch to first main menu frame, set by paintEvent
         self.in_settings = False
         self.in_game_mode_menu = False
         self.in_campaign_menu = False
@@ -83,126 +105,97 @@ class SnakeGame(QMainWindow):
         self.unlocked_levels = 1  # Only first level unlocked initially
         self.current_level = 0    # Current campaign level (0 means not in campaign mode)
         
-        # Create a container widget that will hold all our screens
-        self.container = QWidget()
-        self.setCentralWidget(self.container)
-        self.container_layout = QVBoxLayout(self.container)
-        self.container_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Setup menus (they'll be added to container when needed)
-        self.setup_main_menu()
-        self.setup_settings_menu()
-        self.setup_game_mode_menu()
-        self.setup_campaign_menu()  # Setup campaign level selection menu
+        # Every screen lives on one stack; each is built the first time it
+        # is shown and kept. The game itself is drawn by paintEvent, under
+        # an empty page
+        self.screens = ScreenManager()
+        self.setCentralWidget(self.screens)
+        self.screens.register('main_menu', self.setup_main_menu)
+        self.screens.register('settings', self.setup_settings_menu)
+        self.screens.register('game_mode', self.setup_game_mode_menu)
+        self.screens.register('campaign', self.setup_campaign_menu)
+        self.screens.register('mission_intro', self.setup_mission_intro)
+        self.screens.register('game', QWidget)
         
         # Show the main menu initially
-        self.container_layout.addWidget(self.menu_widget)
+        self.screens.show_screen('main_menu')
         
         # Colors
         self.bg_color = QColor(0, 51, 0)      # Dark green background
         self.grid_color = QColor(0, 45, 0)    # Slightly lighter green for grid
         self.snake_color = QColor(0, 255, 0)  # Bright green for snake
         
-        # Initialize game state
-        self.snake = [(self.width//2, self.height//2)]
-        self.direction = (1, 0)
-        self.score = 0
-        self.game_over = False
+        # Cached static layer (checkerboard + boulders), see get_background_layer
+        self.background_layer = None
+        self.background_layer_key = None
+        
+        # What the HUD showed when it was last invalidated, see update_hud
+        self.hud_state = None
         
-        # Golden apple settings
-        self.golden_apple_active = False
-        self.apples_eaten = 0
+        # Golden apple blink state
         self.golden_apple_glow = True
-        self.golden_apple_timer_value = 5
-        self.golden_apple_current_time = self.golden_apple_timer_value
-        self.golden_apple_spawned_in_current_basket = False  # Track if golden apple spawned in current basket
         
-        # Load images
+        # Images come from the prebuilt pack when there is one (see
+        # asset_pack.py), otherwise they are decoded lazily on a worker pool.
+        # The main menu draws none of them, so nothing blocks startup; what a
+        # game needs is queued right away and is usually ready before the
+        # first game starts
         asset_dir = os.path.join(current_dir, 'asset')
-        self.images = {
-            'apple': QImage(os.path.join(asset_dir, 'apple.png')),
-            'apple_gold_glow': QImage(os.path.join(asset_dir, 'apple_gold_glow.png')),
-            'apple_gold_glow_out': QImage(os.path.join(asset_dir, 'apple_gold_glow_out.png')),
-            'body': QImage(os.path.join(asset_dir, 'snake_body.png')),
-            'head': QImage(os.path.join(asset_dir, 'snake_head.png'))
-        }
-        
-        # Load mission assets
-        mission_dir = os.path.join(asset_dir, 'mission', 'mission 1')
-        self.mission_images = {
-            'green_crystal': QImage(os.path.join(mission_dir, 'green_crystal.png')),
-            'red_crystal': QImage(os.path.join(mission_dir, 'red_crystal.png')),
-        }
-        
-        # Load boulder images
-        boulder_dir = os.path.join(asset_dir, 'boulder')
-        self.boulder_images = []
-        for i in range(1, 10):  # boulder1 through boulder9
-            image = QImage(os.path.join(boulder_dir, f'boulder{i}.png'))
-            if not image.isNull():
-                self.boulder_images.append(image)
-        
-        # Initialize obstacles lists
-        self.boulders = []
-        
-        # Load celebration GIF
-        self.celebration_movie = QMovie(os.path.join(asset_dir, 'celebration.gif'))
-        self.celebration_movie.setCacheMode(QMovie.CacheAll)
-        self.celebration_movie.frameChanged.connect(self.update)  # Update screen when animation frame changes
-        
-        # Scale images
-        for key in self.images:
-            if not self.images[key].isNull():
-                # After modification: Use nearest-neighbor (fast) transformation for pixelated scaling
-                self.images[key] = self.images[key].scaled(self.cell_size, self.cell_size,
-                                                            Qt.KeepAspectRatio, Qt.FastTransformation)
-        
-        # Scale mission images too
-        for key in self.mission_images:
-            if not self.mission_images[key].isNull():
-                self.mission_images[key] = self.mission_images[key].scaled(
-                    self.cell_size, self.cell_size,
-                    Qt.KeepAspectRatio, Qt.SmoothTransformation
-                )
-        
-        # Initialize crystal tracking
-        self.red_crystal_positions = []  # Will be filled in initialize_mission
-        self.red_crystals_eaten = set()
-        self.crystals_collected = 0
-        self.slow_effect_active = False
-        self.crystal_milestones = [0, 2, 5, 10, 15]  # After these green crystals, spawn red crystals
-        
-        # Create food (green crystal)
-        self.food = self.create_food()
-        
-        # Immediately spawn two red crystals at game start
-        self.initialize_red_crystals()
-        
-        # Setup timers
-        self.golden_apple_timer = QTimer()
-        self.golden_apple_timer.timeout.connect(self.golden_apple_countdown)
-        self.golden_apple_timer.setInterval(1000)  # 1 second intervals
-        
-        self.golden_apple_blink_timer = QTimer()
-        self.golden_apple_blink_timer.timeout.connect(self.toggle_golden_apple_glow)
-        self.golden_apple_blink_timer.start(100)  # Blink every 200ms
-        
-        # Game timer - initially stopped until game starts
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_game)
-        # Don't start the timer until game starts
+        pack = AssetPack.open(os.path.join(asset_dir, 'sprites.pack'), asset_dir)
+        self.assets = AssetManager(asset_dir, pack=pack)
+        self.assets.loaded.connect(self.on_asset_loaded)
+        self.assets.preload(GAME_ASSETS)
+        self.boulder_names = self.assets.available('boulder')
+        
+        # Mission intros are pre-rendered on a worker while the campaign menu is up
+        self.intros = IntroRenderer(self.assets)
+        self.intros.rendered.connect(self.on_intro_rendered)
+        
+        # The celebration animation is created when first needed; nothing plays it yet
+        self.celebration_movie = None
+        
+        # get_sprite scales and rotates the decoded images once per target
+        # size and caches the result
+        self.sprite_cache = {}
+        
+        # Game rules and state live in the headless engine; this window only draws it
+        self.engine = GameState(self.width, self.height, boulder_variants=len(self.boulder_names))
+        self.recorder = ReplayRecorder(self.engine, CASUAL)
+        
+        # Snapshot to retry from after a game over: taken when a game starts
+        # and again every checkpoint_points points
+        self.checkpoint = None
+        self.checkpoint_score = 0
+        self.checkpoint_points = 10
+        
+        # Setup timers; the 'game' group freezes while the game is paused.
+        # The blink timer only runs while a golden apple is on the board
+        self.golden_apple_blink_timer = self.scheduler.timer(self.toggle_golden_apple_glow, 100, group='game')  # Blink every 200ms
+        
+        # Game timer - initially stopped until game starts. It fires at the
+        # display rate; each frame runs the engine ticks that are due on a
+        # fixed timestep and draws the snake part of the way to its next cell
+        self.timer = self.scheduler.timer(self.run_frame, group='game')
+        refresh_rate = QApplication.primaryScreen().refreshRate() or 60
+        self.frame_interval = max(1, int(1000 / refresh_rate))
+        self.tick_accumulator = 0.0  # Milliseconds of game time not yet simulated
+        self.last_frame_time = 0.0
+        self.render_alpha = 1.0  # How far the snake has slid towards its current cells
+        self.max_catch_up_ticks = 5  # Ticks run in one frame after a stall; the rest is dropped
+        
+        # Turns normally wait for the next tick; in immediate mode a turn made
+        # with nothing queued moves the snake right away and restarts the tick
+        self.immediate_turns = False
+        self.input_latencies = deque(maxlen=256)  # Key press to move, in ms
         
         # Animation settings
         self.score_animation = 0
-        self.score_animation_timer = QTimer()
-        self.score_animation_timer.timeout.connect(self.update_score_animation)
-        self.score_animation_timer.setInterval(50)  # 50ms for smooth animation
+        self.score_animation_timer = self.scheduler.timer(self.update_score_animation, 50)  # 50ms for smooth animation
         
         self.new_high_score = False
+        self.beaten_percent = None  # "You beat X% of runs" on the game over screen
         self.high_score_blink = False
-        self.high_score_blink_timer = QTimer()
-        self.high_score_blink_timer.timeout.connect(self.toggle_high_score_blink)
-        self.high_score_blink_timer.setInterval(500)  # 500ms blink interval
+        self.high_score_blink_timer = self.scheduler.timer(self.toggle_high_score_blink, 500)  # 500ms blink interval
         
         # Pause menu state
         self.paused = False
@@ -211,12 +204,6 @@ class SnakeGame(QMainWindow):
         
         self.setFocusPolicy(Qt.StrongFocus)
         
-        # Create mission timer
-        self.mission_timer = QTimer(self)
-        self.mission_timer.timeout.connect(self.update_oxygen_level)
-        self.oxygen_level = 100  # Start with 100% oxygen
-        self.oxygen_depletion_time = 90  # 90 seconds to fully deplete
-        
         # Show fullscreen using a more direct approach
         self.showFullScreen()
         self.setFixedSize(self.screen_width, self.screen_height)
@@ -224,196 +211,97 @@ class SnakeGame(QMainWindow):
         # Make sure the window is truly maximized and takes up the entire screen
         self.move(0, 0)
         
-        # In the constructor after creating the container widget:
-        self.container.setFixedSize(self.screen_width, self.screen_height)
+        # The screen stack covers the whole window
+        self.screens.setFixedSize(self.screen_width, self.screen_height)
         
-        # Load oxygen warning sound
-        self.oxygen_warning_sound = QMediaContent(QUrl.fromLocalFile(os.path.join(sound_effect_dir, 'oxygen.mp3')))
+        # Add oxygen warning timer
+        self.oxygen_warning_timer = self.scheduler.timer(self.play_oxygen_warning, 5000, group='game')  # Play every 5 seconds
         
-        # Add oxygen warning timer and flag
-        self.oxygen_warning_active = False
-        self.oxygen_warning_timer = QTimer()
-        self.oxygen_warning_timer.timeout.connect(self.play_oxygen_warning)
-        self.oxygen_warning_timer.setInterval(5000)  # Play every 5 seconds
+        # Pick up the game that was running when the window was last closed
+        self.resume_saved_game()
 
-    def setup_data_directory(self):
-        """Create data directory if it doesn't exist"""
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.data_dir = os.path.join(current_dir, 'data_score')
-        self.score_file = os.path.join(self.data_dir, 'high_score.json')
+    def setup_data_directory(self, data_dir=None):
+        """Create data directory if it doesn't exist and open the score store"""
+        # data_score next to this file unless another directory is given
+        if data_dir is None:
+            data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_score')
+        self.data_dir = data_dir
         
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
         
-        # Create JSON file with correct structure if it doesn't exist
-        if not os.path.exists(self.score_file):
-            default_data = {'scores': [], 'high_score': 0}
-            with open(self.score_file, 'w') as f:
-                json.dump(default_data, f)
+        # Scores live in SQLite; the old JSON file is imported the first time.
+        # Games are saved by a background writer, off the GUI thread, to
+        # whichever database open_score_store settled on
+        score_db = os.path.join(self.data_dir, 'scores.db')
+        self.score_store = self.open_score_store(score_db)
+        self.games_finished = 0  # Numbers the games handed to the writer
+        self.score_ranked.connect(self.on_score_ranked)
+        self.score_writer = ScoreWriter(self.score_store.path, on_error=self.on_score_save_failed,
+                                        on_recorded=self.score_ranked.emit)
+
+    def open_score_store(self, path):
+        """Open the score database, setting aside one that can't be read"""
+        legacy_json = os.path.join(self.data_dir, 'high_score.json')
+        try:
+            return ScoreStore(path, legacy_json=legacy_json)
+        except sqlite3.Error as e:
+            self.event_log.record(ERROR, 'score_store_unreadable', error=str(e))
+        
+        # Keep the bad file for inspection and start a fresh history; the old
+        # JSON scores are imported into it again
+        try:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.replace(path + suffix, path + '.corrupt' + suffix)
+            return ScoreStore(path, legacy_json=legacy_json)
+        except (OSError, sqlite3.Error) as e:
+            # Nothing on disk can be used: the score writer gets an in-memory
+            # database of its own, so this session's games are still saved
+            # and ranked, and are gone when the game quits
+            self.event_log.record(ERROR, 'score_store_unavailable', error=str(e))
+            return ScoreStore(':memory:', legacy_json=legacy_json)
 
     def load_high_score(self):
-        """Load high score from JSON file"""
+        """Load high score from the score store"""
         try:
-            if os.path.exists(self.score_file):
-                with open(self.score_file, 'r') as f:
-                    data = json.load(f)
-                    return data.get('high_score', 0)
-            else:
-                return 0
-        except Exception as e:
+            return self.score_store.high_score()
+        except sqlite3.Error:
             return 0
 
+    def game_mode(self):
+        """Mode the current game is recorded under in the score history"""
+        if self.engine.in_mission_mode:
+            return 'mission'
+        return 'campaign' if self.current_level else 'casual'
+
     def save_high_score(self):
-        """Save high score and current score to JSON file"""
-        try:
-            # Create default data structure
-            default_data = {'scores': [], 'high_score': self.high_score}
-            
-            # Load existing data if file exists
-            if os.path.exists(self.score_file):
-                try:
-                    with open(self.score_file, 'r') as f:
-                        file_content = f.read().strip()
-                        # Check if file is not empty
-                        if file_content:
-                            data = json.loads(file_content)
-                            # Ensure both keys exist
-                            if 'scores' not in data:
-                                data['scores'] = []
-                            if 'high_score' not in data:
-                                data['high_score'] = 0
-                        else:
-                            data = default_data
-                except Exception:
-                    data = default_data
-            else:
-                data = default_data
-                
-            # Add current score to scores list
-            if self.score > 0:  # Only add scores greater than 0
-                data['scores'].append(self.score)
-            
-            # Keep only the last 10 scores
-            if len(data['scores']) > 10:
-                data['scores'] = data['scores'][-10:]
-            
-            # Update high score based on maximum score
-            all_scores = data['scores'] + [data['high_score']]
-            all_scores = [s for s in all_scores if s > 0]  # Remove zeros
-            if all_scores:
-                data['high_score'] = max(all_scores)
-            
-            # Make sure high score is at least the current high score
-            if self.high_score > data['high_score']:
-                data['high_score'] = self.high_score
-            
-            # Save updated data
-            with open(self.score_file, 'w') as f:
-                json.dump(data, f)
-            
-        except Exception:
-            # If all else fails, create a new file with basic structure
-            try:
-                with open(self.score_file, 'w') as f:
-                    json.dump({'scores': [self.score], 'high_score': self.high_score}, f)
-            except:
-                pass
+        """Queue the finished game for the background score writer"""
+        engine = self.engine
+        mode = self.game_mode()
+        level = crystals = None
+        if mode == 'mission':
+            level = self.current_mission
+            crystals = engine.crystals_collected
+        elif mode == 'campaign':
+            level = self.current_level
+        self.score_writer.record_game(engine.score, mode, level, engine.boulder_count,
+                                      engine.game_time / 1000, crystals, token=self.games_finished)
+
+    def on_score_ranked(self, game_number, percentile):
+        """Show where the game just saved ranks, unless another game has ended since"""
+        if game_number == self.games_finished:
+            self.beaten_percent = percentile
+            self.update()
+
+    def on_score_save_failed(self, error):
+        """Called on the score writer's thread when a save fails"""
+        self.event_log.record(ERROR, 'score_save_failed', error=str(error))
 
     def update_high_score(self):
         """Update high score if current score is higher"""
-        if self.score > self.high_score:
-            self.high_score = self.score
-            self.save_high_score()
-
-    def create_food(self):
-        # Check for golden apple spawn
-        if self.apples_eaten % 10 == 0:
-            self.golden_apple_spawned_in_current_basket = False
-        
-        # Skip golden apple logic in mission mode
-        if not hasattr(self, 'in_mission_mode') or not self.in_mission_mode:
-            if (not self.golden_apple_active and 
-                not self.golden_apple_spawned_in_current_basket and 
-                self.apples_eaten > 0 and 
-                random.random() < 0.1):
-                
-                self.golden_apple_active = True
-                self.golden_apple_spawned_in_current_basket = True
-                self.golden_apple_current_time = self.golden_apple_timer_value
-                self.golden_apple_timer.start()
-        
-        # Create new food position with vertical restriction
-        margin_top = 2  # Keep 2 cells from the top for score display
-        
-        # Create a list of all available positions
-        available_positions = []
-        for x in range(self.width):
-            for y in range(margin_top, self.height):
-                pos = (x, y)
-                # Check if position is valid (not on snake or boulders)
-                if pos not in self.snake and not any(pos in boulder_cells for boulder_cells, _ in self.boulders):
-                    available_positions.append(pos)
-        
-        if not available_positions:
-            # If no positions available, return a random position
-            return (random.randint(0, self.width - 1), random.randint(margin_top, self.height - 1))
-        
-        # Select food position from available positions
-        food_pos = random.choice(available_positions)
-        
-        # Place boulders only in casual mode
-        if not hasattr(self, 'in_mission_mode') or not self.in_mission_mode:
-            if self.obstacles_enabled and len(self.boulders) < self.boulder_count:
-                self.place_boulders(food_pos)
-        
-        return food_pos
-
-    def place_boulders(self, food_pos):
-        """Place boulder obstacles"""
-        # Skip if obstacles are disabled or we're at max boulders
-        if not self.obstacles_enabled or len(self.boulders) >= self.boulder_count:
-            return
-        
-        # Find positions where the snake will be in the next few moves
-        immediate_path = []
-        if len(self.snake) > 0:
-            head = self.snake[0]
-            next_pos = ((head[0] + self.direction[0]) % self.width, 
-                        (head[1] + self.direction[1]) % self.height)
-            immediate_path.append(next_pos)
-        
-        margin_top = 2  # Same margin as for food
-        
-        # Place boulders (2x2)
-        attempts = 0
-        while len(self.boulders) < self.boulder_count and attempts < 100:
-            attempts += 1
-            
-            # Get a random position for the top-left corner of the boulder
-            x = random.randint(0, self.width - 2)  # -2 to leave room for width of boulder
-            y = random.randint(margin_top, self.height - 2)  # -2 to leave room for height of boulder
-            
-            # Generate the four positions for the 2x2 boulder
-            boulder_positions = [
-                (x, y),        # Top-left
-                (x + 1, y),    # Top-right
-                (x, y + 1),    # Bottom-left
-                (x + 1, y + 1) # Bottom-right
-            ]
-            
-            # Check if this boulder would overlap with anything
-            overlap = False
-            for pos in boulder_positions:
-                if (pos in self.snake or 
-                    pos == food_pos or 
-                    pos in immediate_path or
-                    any(pos in existing_boulder for existing_boulder, _ in self.boulders)):
-                    overlap = True
-                    break
-            
-            # If no overlap and we have boulder images, add the boulder
-            if not overlap and self.boulder_images:
-                self.boulders.append((boulder_positions, random.choice(self.boulder_images)))
+        if self.engine.score > self.high_score:
+            self.high_score = self.engine.score
 
     def setup_main_menu(self):
         """Setup the main menu UI"""
@@ -444,8 +332,8 @@ class SnakeGame(QMainWindow):
         """
         
         # Create and add the buttons with hover sound
-        self.play_button = HoverButton("Play", self, self.sound_player, lambda: self.sound_enabled)
-        self.play_button.set_hover_sound(self.hover_sound)
+        self.play_button = HoverButton("Play", self, self.audio, lambda: self.sound_enabled)
+        self.play_button.set_hover_sound('hover')
         self.play_button.setFixedSize(200, 50)
         self.play_button.setFont(QFont("Courier", 16))
         self.play_button.setStyleSheet(button_style)
@@ -456,8 +344,8 @@ class SnakeGame(QMainWindow):
         layout.addSpacing(20)
         
         # Create Settings button
-        self.settings_button = HoverButton("Settings", self, self.sound_player, lambda: self.sound_enabled)
-        self.settings_button.set_hover_sound(self.hover_sound)
+        self.settings_button = HoverButton("Settings", self, self.audio, lambda: self.sound_enabled)
+        self.settings_button.set_hover_sound('hover')
         self.settings_button.setFixedSize(200, 50)
         self.settings_button.setFont(QFont("Courier", 16))
         self.settings_button.setStyleSheet(button_style)
@@ -468,8 +356,8 @@ class SnakeGame(QMainWindow):
         layout.addSpacing(20)
         
         # Create Exit button
-        self.exit_button = HoverButton("Exit", self, self.sound_player, lambda: self.sound_enabled)
-        self.exit_button.set_hover_sound(self.hover_sound)
+        self.exit_button = HoverButton("Exit", self, self.audio, lambda: self.sound_enabled)
+        self.exit_button.set_hover_sound('hover')
         self.exit_button.setFixedSize(200, 50)
         self.exit_button.setFont(QFont("Courier", 16))
         self.exit_button.setStyleSheet(button_style)
@@ -481,6 +369,7 @@ class SnakeGame(QMainWindow):
         
         # Set the layout
         self.menu_widget.setLayout(layout)
+        return self.menu_widget
 
     def setup_settings_menu(self):
         """Setup the settings menu"""
@@ -571,8 +460,8 @@ class SnakeGame(QMainWindow):
         layout.addSpacing(40)  # More space before Back button
         
         # Back button with hover sound
-        back_button = HoverButton("Back", self, self.sound_player, lambda: self.sound_enabled)
-        back_button.set_hover_sound(self.hover_sound)
+        back_button = HoverButton("Back", self, self.audio, lambda: self.sound_enabled)
+        back_button.set_hover_sound('hover')
         back_button.setFixedSize(200, 50)
         back_button.setFont(QFont("Courier", 16))
         back_button.setStyleSheet("""
@@ -612,6 +501,7 @@ class SnakeGame(QMainWindow):
         # Update the labels based on current settings
         self.update_sound_labels()
         self.update_boulder_labels()
+        return self.settings_widget
 
     def toggle_sound_on(self, event):
         """Enable sound effects"""
@@ -687,41 +577,38 @@ class SnakeGame(QMainWindow):
         
         # Unpause the game
         self.paused = False
+        self.scheduler.resume('game')
         
         # Stop the celebration if showing
-        if hasattr(self, 'celebration_movie') and self.celebration_movie.state() == QMovie.Running:
+        if self.celebration_movie is not None and self.celebration_movie.state() == QMovie.Running:
             self.celebration_movie.stop()
         
         # Restore original colors if needed
-        if hasattr(self, 'original_bg_color') and hasattr(self, 'in_mission_mode') and self.in_mission_mode:
+        if hasattr(self, 'original_bg_color') and self.engine.in_mission_mode:
             self.bg_color = self.original_bg_color
             self.grid_color = self.original_grid_color
         
-        # Clear container layout
-        while self.container_layout.count():
-            item = self.container_layout.takeAt(0)
-            if item.widget():
-                item.widget().hide()
-            
-        # Add and show main menu
-        self.container_layout.addWidget(self.menu_widget)
-        self.menu_widget.show()
+        # Show the main menu
+        self.screens.show_screen('main_menu')
+        
+        # Stop the game, the apple blink, any mission warnings and the game
+        # over animations; nothing in the menu needs a timer
+        self.timer.stop()
+        self.oxygen_warning_timer.stop()
+        self.golden_apple_blink_timer.stop()
+        self.stop_game_over_animations()
         
         # Reset game state
-        self.game_over = False
+        self.engine.game_over = False
         self.in_main_menu = True
         self.in_settings = False
         self.in_game_mode_menu = False
         self.in_campaign_menu = False
         
         # Reset mission state
-        self.in_mission_mode = False
+        self.engine.in_mission_mode = False
         self.in_mission_intro = False
         
-        # Make sure mission timer is stopped
-        if hasattr(self, 'mission_timer') and self.mission_timer.isActive():
-            self.mission_timer.stop()
-        
         self.update()
 
     def show_settings(self):
@@ -730,15 +617,8 @@ class SnakeGame(QMainWindow):
         if hasattr(self, 'pause_overlay') and self.pause_overlay:
             self.pause_overlay.setVisible(False)
         
-        # Clear container layout
-        while self.container_layout.count():
-            item = self.container_layout.takeAt(0)
-            if item.widget():
-                item.widget().hide()
-        
-        # Add and show settings
-        self.container_layout.addWidget(self.settings_widget)
-        self.settings_widget.show()
+        # Show settings
+        self.screens.show_screen('settings')
         self.in_settings = True
         self.in_main_menu = False
         self.update()
@@ -754,19 +634,12 @@ class SnakeGame(QMainWindow):
     def show_game_mode_menu(self):
         """Show the game mode selection menu"""
         # Stop any running game timers
-        if self.timer.isActive():
+        if self.timer.is_active():
             self.timer.stop()
+        self.stop_game_over_animations()
         
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
-        
-        # Add and show the game mode menu
-        self.container_layout.addWidget(self.game_mode_widget)
-        self.game_mode_widget.show()
+        # Show the game mode menu
+        self.screens.show_screen('game_mode')
         
         # Update state flags
         self.in_main_menu = False
@@ -784,12 +657,8 @@ class SnakeGame(QMainWindow):
         if hasattr(self, 'pause_overlay') and self.pause_overlay:
             self.pause_overlay.setVisible(False)
         
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
+        # Switch to the empty page the game is drawn under
+        self.screens.show_screen('game')
         
         # Reset game state
         self.reset_game()
@@ -801,29 +670,25 @@ class SnakeGame(QMainWindow):
         
         # Start the game timer
         self.paused = False
-        self.timer.start(100)  # Adjust speed as needed
+        self.start_game_loop()
         
         # Set focus to the game
         self.setFocus()
 
     def start_campaign_game(self):
         """Open campaign menu showing all levels as coming soon"""
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
-        
-        # Add and show the campaign menu
-        self.container_layout.addWidget(self.campaign_widget)
-        self.campaign_widget.show()
+        # Show the campaign menu
+        self.screens.show_screen('campaign')
         
         # Update state flags
         self.in_main_menu = False
         self.in_settings = False
         self.in_game_mode_menu = False
         self.in_campaign_menu = True
+        self.in_mission_intro = False
+        
+        # The mission intro is one click away; render it in the background now
+        self.intros.prefetch(*self.mission_intro_key(1))
         
         # Make sure game is paused
         self.paused = True
@@ -834,12 +699,8 @@ class SnakeGame(QMainWindow):
         if level > self.unlocked_levels:
             return  # Level is locked
         
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
+        # Switch to the empty page the game is drawn under
+        self.screens.show_screen('game')
         
         # Reset game state
         self.reset_game()
@@ -848,7 +709,12 @@ class SnakeGame(QMainWindow):
         self.current_level = level
         
         # Configure game based on level (customize difficulty per level)
-        self.configure_level(level)
+        self.engine.configure_level(level)
+        self.recorder.mode = LEVEL
+        self.recorder.level = level
+        self.take_checkpoint()
+        if self.event_log.level <= INFO:
+            self.event_log.record(INFO, 'level_start', campaign_level=level, boulders=self.engine.boulder_count)
         
         # Update state flags
         self.in_main_menu = False
@@ -856,41 +722,13 @@ class SnakeGame(QMainWindow):
         self.in_game_mode_menu = False
         self.in_campaign_menu = False
         
-        # Start the game timer
+        # Start the game timer at the level's speed
         self.paused = False
-        self.timer.start(100)  # Base speed, might be adjusted by level configuration
+        self.start_game_loop()
         
         # Set focus to the game
         self.setFocus()
 
-    def configure_level(self, level):
-        """Configure game settings based on level difficulty"""
-        # Base settings
-        self.obstacles_enabled = True
-        
-        # Configure difficulty based on level
-        if level == 1:
-            self.boulder_count = 2
-            self.timer.setInterval(120)  # Slower speed for level 1
-        elif level == 2:
-            self.boulder_count = 3
-            self.timer.setInterval(115)
-        elif level == 3:
-            self.boulder_count = 4
-            self.timer.setInterval(110)
-        elif level == 4:
-            self.boulder_count = 5
-            self.timer.setInterval(105)
-        elif level == 5:
-            self.boulder_count = 6
-            self.timer.setInterval(100)
-        elif level == 6:
-            self.boulder_count = 7
-            self.timer.setInterval(90)  # Fastest speed for level 6
-        
-        # Place boulders
-        self.place_boulders(self.food)
-
     def apply_rounded_corners(self):
         """Apply rounded corners to the window - disabled in fullscreen mode"""
         # In fullscreen mode, don't apply any mask or rounded corners
@@ -926,40 +764,35 @@ class SnakeGame(QMainWindow):
                 # Convert x to an integer using round()
                 x = round((playable_width - text_width) / 2)
                 qp.drawText(x, 100, title_text)
+                
+                if self.cold_start_ms is None:
+                    self.cold_start_ms = (time.perf_counter() - LAUNCH_TIME) * 1000
+                    self.event_log.record(INFO, 'cold_start', ms=round(self.cold_start_ms, 1))
             
             return
         
+        engine = self.engine
+        
         # Regular game painting - now with antialiasing off for pixel-perfect game grid
         qp.setRenderHint(QPainter.Antialiasing, False)
         
-        # Draw checkerboard pattern
-        for i in range(self.width):
-            for j in range(self.height):
-                x = i * cell_size_x
-                y = j * cell_size_y
-                # Round x and y to the nearest integer *before* passing to fillRect
-                x = round(x)
-                y = round(y)
-                # Use the calculated cell_size_x and cell_size_y, and round up the size
-                # to ensure we cover any fractional parts of the screen
-                if (i + j) % 2 == 0:
-                    qp.fillRect(x, y, round(cell_size_x + 0.5), round(cell_size_y + 0.5), self.bg_color)
-                else:
-                    qp.fillRect(x, y, round(cell_size_x + 0.5), round(cell_size_y + 0.5), self.grid_color)
+        # Static layer: checkerboard and boulders, redrawn only when they change
+        qp.drawPixmap(0, 0, self.get_background_layer(playable_width, playable_height,
+                                                      cell_size_x, cell_size_y))
         
         # Display score and high score at the top of the game screen
-        if not self.game_over:
+        if not engine.game_over:
             # Draw score text
             qp.setPen(self.snake_color)
             qp.setFont(QFont('Courier', 12))
             
-            if hasattr(self, 'in_mission_mode') and self.in_mission_mode:
+            if engine.in_mission_mode:
                 # For mission mode, show remaining crystals and oxygen level
-                crystals_remaining = self.crystals_required - self.crystals_collected
+                crystals_remaining = engine.crystals_required - engine.crystals_collected
                 score_text = f"GREEN CRYSTAL REMAINING: {crystals_remaining}"
                 
                 # Oxygen level display (rounded to integer)
-                oxygen_text = f"OXYGEN LEVEL: {int(self.oxygen_level)}%"
+                oxygen_text = f"OXYGEN LEVEL: {int(engine.oxygen_level)}%"
                 
                 # Position for crystal count (left side)
                 qp.drawText(10, 20, score_text)
@@ -969,14 +802,14 @@ class SnakeGame(QMainWindow):
                 oxygen_width = metrics.width(oxygen_text)
                 
                 # Add a warning color when oxygen is low (less than 30%)
-                if self.oxygen_level <= 30:
+                if engine.oxygen_level <= 30:
                     qp.setPen(QColor(255, 50, 50))  # Red for danger
-                elif self.oxygen_level <= 50:
+                elif engine.oxygen_level <= 50:
                     qp.setPen(QColor(255, 165, 0))  # Orange for warning
                 qp.drawText(self.width * self.cell_size - oxygen_width - 10, 20, oxygen_text)
             else:
                 # For normal mode, show regular score and high score
-                score_text = f"SCORE: {self.score}"
+                score_text = f"SCORE: {engine.score}"
                 high_score_text = f"HIGH SCORE: {self.high_score}"
                 
                 # Position for score (left side)
@@ -987,100 +820,78 @@ class SnakeGame(QMainWindow):
                 high_score_width = metrics.width(high_score_text)
                 qp.drawText(self.width * self.cell_size - high_score_width - 10, 20, high_score_text)
         
-        # Draw snake - using the calculated cell sizes for positioning
-        for i, segment in enumerate(self.snake):
-            # Calculate the position using the same cell_size_x and cell_size_y
-            x = round(segment[0] * cell_size_x)
-            y = round(segment[1] * cell_size_y)
+        # Snake and apple sprites are cell_size pixels; the head is rotated based on current direction
+        cell = self.cell_size
+        head_sprite = self.get_sprite('head', cell, cell, self.direction_angle(engine.direction))
+        body_sprite = self.get_sprite('body', cell, cell)
+        
+        # Draw snake - every segment slides from the cell it held on the
+        # previous tick (the next segment's cell, or the vacated tail) towards
+        # its current one. Wrapping through an edge snaps instead.
+        # The snake is a deque, so walk it in pairs instead of indexing it
+        alpha = self.render_alpha
+        snake = engine.snake
+        previous_cells = chain(islice(snake, 1, None), (engine.vacated_tail,))
+        sprite = head_sprite
+        for (sx, sy), previous in zip(snake, previous_cells):
+            if alpha < 1 and previous is not None and abs(sx - previous[0]) <= 1 and abs(sy - previous[1]) <= 1:
+                sx = previous[0] + (sx - previous[0]) * alpha
+                sy = previous[1] + (sy - previous[1]) * alpha
             
-            if i == 0:  # Head
-                # Rotate head based on current direction
-                rotated_head = self.get_rotated_image(self.images['head'], self.direction)
-                qp.drawImage(x, y, rotated_head)
-            else:  # Body
-                qp.drawImage(x, y, self.images['body'])
+            # Calculate the position using the same cell_size_x and cell_size_y
+            x = round(sx * cell_size_x)
+            y = round(sy * cell_size_y)
+            qp.drawPixmap(x, y, sprite)
+            sprite = body_sprite
         
         # Draw food (normal apple, golden apple, or mission crystal)
-        if hasattr(self, 'in_mission_mode') and self.in_mission_mode:
+        if engine.in_mission_mode:
             # Draw the appropriate crystal for mission mode
-            x = round(self.food[0] * cell_size_x)
-            y = round(self.food[1] * cell_size_y)
-            
-            # Use regular cell size for 1x1 crystal
-            crystal_width = round(cell_size_x)
-            crystal_height = round(cell_size_y)
+            x = round(engine.food[0] * cell_size_x)
+            y = round(engine.food[1] * cell_size_y)
             
             # Determine which crystal image to use
             crystal_type = 'green'
             if hasattr(self, 'current_crystal_type'):
                 crystal_type = self.current_crystal_type
             
-            # Draw the crystal image if it exists
-            crystal_key = crystal_type + '_crystal'
-            if crystal_key in self.mission_images and not self.mission_images[crystal_key].isNull():
-                crystal_img = self.mission_images[crystal_key].scaled(
-                    crystal_width, crystal_height,
-                    Qt.IgnoreAspectRatio, Qt.SmoothTransformation
-                )
-                qp.drawImage(x, y, crystal_img)
+            # Draw the crystal image if it exists, using regular cell size for 1x1 crystal
+            crystal_img = self.get_sprite(crystal_type + '_crystal', round(cell_size_x), round(cell_size_y))
+            if not crystal_img.isNull():
+                qp.drawPixmap(x, y, crystal_img)
             
-            # Draw red crystals
-            if hasattr(self, 'red_crystal_positions'):
-                for pos in self.red_crystal_positions:
-                    x = round(pos[0] * cell_size_x)
-                    y = round(pos[1] * cell_size_y)
-                    
-                    # Draw the red crystal image
-                    if 'red_crystal' in self.mission_images and not self.mission_images['red_crystal'].isNull():
-                        red_crystal_img = self.mission_images['red_crystal'].scaled(
-                            crystal_width, crystal_height,
-                            Qt.IgnoreAspectRatio, Qt.SmoothTransformation
-                        )
-                        qp.drawImage(x, y, red_crystal_img)
+            # Red crystals are drawn by draw_red_crystals below
         
         else:
             # Regular apple drawing
-            if self.golden_apple_active:
-                apple_img = self.images['apple_gold_glow' if self.golden_apple_glow else 'apple_gold_glow_out']
+            if engine.golden_apple_active:
+                apple_img = self.get_sprite('apple_gold_glow' if self.golden_apple_glow else 'apple_gold_glow_out',
+                                            cell, cell)
                 
                 # Draw countdown timer
                 qp.setPen(self.snake_color)
                 qp.setFont(QFont('Courier', 24))
-                timer_text = str(self.golden_apple_current_time)
+                timer_text = str(engine.golden_apple_current_time)
                 metrics = qp.fontMetrics()
                 text_width = metrics.width(timer_text)
                 x = round((playable_width - text_width) / 2)
                 y = 30  # Position at top of screen
                 qp.drawText(x, y, timer_text)
             else:
-                apple_img = self.images['apple']
+                apple_img = self.get_sprite('apple', cell, cell)
             
-            qp.drawImage(
-                round(self.food[0] * cell_size_x),
-                round(self.food[1] * cell_size_y),
+            qp.drawPixmap(
+                round(engine.food[0] * cell_size_x),
+                round(engine.food[1] * cell_size_y),
                 apple_img
             )
         
-        # Draw boulders (2x2 size)
-        for boulder_positions, boulder_img in self.boulders:
-            # Calculate the top-left corner and size (2x2 cells)
-            top_left_pos = boulder_positions[0]
-            x = round(top_left_pos[0] * cell_size_x)
-            y = round(top_left_pos[1] * cell_size_y)
-            width = round(2 * cell_size_x)
-            height = round(2 * cell_size_y)
-            
-            # Scale image to fill 2x2 cells
-            scaled_img = boulder_img.scaled(width, height, Qt.KeepAspectRatio, Qt.FastTransformation)
-            qp.drawImage(x, y, scaled_img)
-        
         # Call our specialized red crystal drawing method AFTER drawing everything else
         # but before drawing UI overlays (game over, pause screens, etc.)
-        if hasattr(self, 'red_crystal_positions'):
-            self.draw_red_crystals(qp, cell_size_x, cell_size_y)
+        self.draw_red_crystals(qp, cell_size_x, cell_size_y)
         
         # Game over screen
-        if self.game_over:
+        if engine.game_over:
             # Semi-transparent overlay
             overlay = QColor(0, 0, 0, 180)  # Dark overlay with 70% opacity
             
@@ -1097,7 +908,7 @@ class SnakeGame(QMainWindow):
             qp.setFont(QFont('Courier', 36, QFont.Bold))
             
             # Check if game ended because of oxygen depletion in mission mode
-            if hasattr(self, 'oxygen_level') and self.oxygen_level <= 0:
+            if engine.in_mission_mode and engine.oxygen_level <= 0:
                 # Special display for oxygen depletion in mission mode
                 game_over_message = "OXYGEN DEPLETED"
                 text_width = qp.fontMetrics().width(game_over_message)
@@ -1106,7 +917,7 @@ class SnakeGame(QMainWindow):
                 
                 # Draw mission result instead of score
                 qp.setFont(QFont('Courier', 24))
-                crystals_text = f"CRYSTALS COLLECTED: {self.crystals_collected}"
+                crystals_text = f"CRYSTALS COLLECTED: {engine.crystals_collected}"
                 crystals_width = qp.fontMetrics().width(crystals_text)
                 
                 # Calculate vertical positions
@@ -1123,11 +934,17 @@ class SnakeGame(QMainWindow):
                 qp.drawText(int((screen_width - restart_width) // 2), 
                            result_y + 100, restart_text)
                 
+                # Draw checkpoint instruction
+                checkpoint_text = "PRESS C TO RETRY FROM CHECKPOINT"
+                checkpoint_width = qp.fontMetrics().width(checkpoint_text)
+                qp.drawText(int((screen_width - checkpoint_width) // 2), 
+                           result_y + 140, checkpoint_text)
+                
                 # Draw ESC instruction
                 esc_text = "ESC TO RETURN TO MENU"
                 esc_width = qp.fontMetrics().width(esc_text)
                 qp.drawText(int((screen_width - esc_width) // 2), 
-                           result_y + 140, esc_text)
+                           result_y + 180, esc_text)
                 
                 # Show oxygen depleted message
                 qp.setPen(QColor(0, 200, 255))  # Light blue for oxygen message
@@ -1135,7 +952,7 @@ class SnakeGame(QMainWindow):
                 oxygen_message = "You ran out of oxygen! Collect green crystals to replenish it."
                 oxygen_width = qp.fontMetrics().width(oxygen_message)
                 qp.drawText(int((screen_width - oxygen_width) // 2), 
-                          result_y + 200, oxygen_message)
+                          result_y + 240, oxygen_message)
                 
             else:
                 # Regular game over display for normal game mode
@@ -1146,7 +963,7 @@ class SnakeGame(QMainWindow):
                 
                 # Draw score
                 qp.setFont(QFont('Courier', 24))
-                score_text = f"SCORE: {self.score}"
+                score_text = f"SCORE: {engine.score}"
                 score_width = qp.fontMetrics().width(score_text)
                 
                 # Draw high score with potential blinking
@@ -1168,19 +985,33 @@ class SnakeGame(QMainWindow):
                 qp.drawText(int((screen_width - high_score_width) // 2), 
                            score_y + 40, high_score_text)
                 
-                # Draw restart instruction
+                # Draw how this run ranks against earlier ones
                 qp.setPen(QColor(0, 255, 0))
+                if self.beaten_percent is not None:
+                    qp.setFont(QFont('Courier', 16))
+                    beaten_text = f"YOU BEAT {self.beaten_percent:.0f}% OF RUNS"
+                    beaten_width = qp.fontMetrics().width(beaten_text)
+                    qp.drawText(int((screen_width - beaten_width) // 2), 
+                               score_y + 80, beaten_text)
+                
+                # Draw restart instruction
                 qp.setFont(QFont('Courier', 18))
                 restart_text = "PRESS R TO RESTART"
                 restart_width = qp.fontMetrics().width(restart_text)
                 qp.drawText(int((screen_width - restart_width) // 2), 
-                           score_y + 100, restart_text)
+                           score_y + 130, restart_text)
+                
+                # Draw checkpoint instruction
+                checkpoint_text = "PRESS C TO RETRY FROM CHECKPOINT"
+                checkpoint_width = qp.fontMetrics().width(checkpoint_text)
+                qp.drawText(int((screen_width - checkpoint_width) // 2), 
+                           score_y + 170, checkpoint_text)
                 
                 # Draw ESC instruction
                 esc_text = "ESC TO RETURN TO MENU"
                 esc_width = qp.fontMetrics().width(esc_text)
                 qp.drawText(int((screen_width - esc_width) // 2), 
-                           score_y + 140, esc_text)
+                           score_y + 210, esc_text)
 
         # If game is paused, draw semi-transparent overlay
         if self.paused:
@@ -1189,7 +1020,7 @@ class SnakeGame(QMainWindow):
                             self.height * self.cell_size, overlay)
 
         # Draw slow effect indicator if active
-        if hasattr(self, 'slow_effect_active') and self.slow_effect_active:
+        if engine.slow_effect_active:
             qp.setPen(QColor(0, 120, 255))  # Light blue
             qp.setFont(QFont('Courier', 14))
             slow_text = "SLOW EFFECT ACTIVE"
@@ -1199,41 +1030,113 @@ class SnakeGame(QMainWindow):
 
         qp.end()
 
-    def get_rotated_image(self, image, direction):
-        """Rotate image based on direction"""
-        transform = QTransform()
-        
-        # Calculate rotation center
-        center = image.rect().center()
-        transform.translate(center.x(), center.y())
-        
-        # Set rotation angle based on direction
-        if direction == (1, 0):      # Right
-            angle = 90
-        elif direction == (-1, 0):   # Left
-            angle = 270
-        elif direction == (0, -1):   # Up
-            angle = 0
-        else:                        # Down
-            angle = 180
+    def get_background_layer(self, playable_width, playable_height, cell_size_x, cell_size_y):
+        """Return the cached checkerboard and boulder layer, rebuilding it if stale"""
+        # Anything that changes the static layer is part of the key: window
+        # size, pixel ratio, theme colors and the engine's boulder version
+        dpr = self.devicePixelRatioF()
+        key = (playable_width, playable_height, dpr, self.bg_color.rgba(), self.grid_color.rgba(),
+               self.engine.boulder_version)
+        if self.background_layer is not None and self.background_layer_key == key:
+            return self.background_layer
+        
+        # Allocated in device pixels, like the sprites, so it stays sharp on
+        # HiDPI screens; painting on it still uses logical coordinates
+        layer = QPixmap(round(playable_width * dpr), round(playable_height * dpr))
+        layer.setDevicePixelRatio(dpr)
+        layer.fill(self.bg_color)
+        
+        qp = QPainter(layer)
+        qp.setRenderHint(QPainter.Antialiasing, False)
+        
+        # Draw checkerboard pattern
+        for i in range(self.width):
+            for j in range(self.height):
+                x = i * cell_size_x
+                y = j * cell_size_y
+                # Round x and y to the nearest integer *before* passing to fillRect
+                x = round(x)
+                y = round(y)
+                # Use the calculated cell_size_x and cell_size_y, and round up the size
+                # to ensure we cover any fractional parts of the screen
+                if (i + j) % 2 == 0:
+                    qp.fillRect(x, y, round(cell_size_x + 0.5), round(cell_size_y + 0.5), self.bg_color)
+                else:
+                    qp.fillRect(x, y, round(cell_size_x + 0.5), round(cell_size_y + 0.5), self.grid_color)
+        
+        # Draw boulders (2x2 size); they never move during a game
+        # Images are scaled to fill 2x2 cells
+        width = round(2 * cell_size_x)
+        height = round(2 * cell_size_y)
+        for boulder_positions, boulder_index in self.engine.boulders:
+            # Calculate the top-left corner
+            top_left_pos = boulder_positions[0]
+            x = round(top_left_pos[0] * cell_size_x)
+            y = round(top_left_pos[1] * cell_size_y)
+            qp.drawPixmap(x, y, self.get_sprite(self.boulder_names[boulder_index], width, height))
         
-        transform.rotate(angle)
-        transform.translate(-center.x(), -center.y())
+        qp.end()
         
-        return image.transformed(transform, Qt.SmoothTransformation)
+        self.background_layer = layer
+        self.background_layer_key = key
+        return layer
 
-    def toggle_golden_apple_glow(self):
-        if self.golden_apple_active:
-            self.golden_apple_glow = not self.golden_apple_glow
+    def get_sprite(self, name, width, height, rotation=0):
+        """Return a ready-to-blit pixmap of an asset at a size and rotation"""
+        dpr = self.devicePixelRatioF()
+        key = (name, width, height, rotation, dpr)
+        sprite = self.sprite_cache.get(key)
+        if sprite is None:
+            sprite = self.build_sprite(name, width, height, rotation, dpr)
+            # A null sprite means the image is still loading; on_asset_loaded repaints
+            if not sprite.isNull():
+                self.sprite_cache[key] = sprite
+        return sprite
+
+    def build_sprite(self, name, width, height, rotation, dpr):
+        """Scale and rotate an asset for the sprite cache"""
+        pixel_width, pixel_height = round(width * dpr), round(height * dpr)
+        image = self.assets.sprite(name, pixel_width, pixel_height, rotation)
+        if image is None:
+            image = self.assets.image(name)
+            if image.isNull():
+                return QPixmap()
+            image = prepare_sprite(name, image, pixel_width, pixel_height, rotation)
+        
+        sprite = QPixmap.fromImage(image)
+        sprite.setDevicePixelRatio(dpr)
+        return sprite
+
+    def on_asset_loaded(self, name):
+        """Repaint with an image that has finished decoding"""
+        if name.startswith('boulder'):
+            self.background_layer = None  # It was built without this boulder
+        if not self.in_main_menu:
             self.update()
 
-    def golden_apple_countdown(self):
-        """Countdown timer for golden apple"""
-        self.golden_apple_current_time -= 1
-        if self.golden_apple_current_time <= 0:
-            self.golden_apple_active = False
-            self.golden_apple_timer.stop()
-        self.update()
+    def direction_angle(self, direction):
+        """Rotation of the head image for a direction"""
+        if direction == RIGHT:
+            return 90
+        elif direction == LEFT:
+            return 270
+        elif direction == UP:
+            return 0
+        else:                        # Down
+            return 180
+
+    def sync_golden_apple_blink(self):
+        """Run the blink timer only while a golden apple is on the board"""
+        if self.engine.golden_apple_active and not self.engine.game_over:
+            if not self.golden_apple_blink_timer.is_active():
+                self.golden_apple_blink_timer.start()
+        else:
+            self.golden_apple_blink_timer.stop()
+
+    def toggle_golden_apple_glow(self):
+        if self.engine.golden_apple_active:
+            self.golden_apple_glow = not self.golden_apple_glow
+            self.update(self.cell_rect(self.engine.food))
 
     def toggle_high_score_blink(self):
         """Toggle high score blink state"""
@@ -1248,96 +1151,133 @@ class SnakeGame(QMainWindow):
             self.score_animation_timer.stop()
         self.update()
 
-    def update_game(self):
-        if self.game_over:
-            return
-        
-        head = self.snake[0]
-        new_x = (head[0] + self.direction[0]) % self.width
-        new_y = (head[1] + self.direction[1]) % self.height
-        new_head = (new_x, new_y)
-        
-        # Debug collision detection
-        print(f"Head position: {new_head}")
-        if hasattr(self, 'red_crystal_positions'):
-            print(f"Red crystal positions: {self.red_crystal_positions}")
-        
-        # Check for collision with snake body or boulders
-        if (new_head in self.snake[1:] or 
-            any(new_head in boulder_cells for boulder_cells, _ in self.boulders)):
-            self.game_over_handler()
+    def stop_game_over_animations(self):
+        """Stop the game over screen's high score blink and score animation"""
+        self.high_score_blink_timer.stop()
+        self.score_animation_timer.stop()
+        self.score_animation = 0
+
+    def arm_scheduler_timer(self, deadline):
+        """Point the single Qt timer at the scheduler's next deadline"""
+        if deadline is None:
+            self.scheduler_timer.stop()
+        else:
+            delay = math.ceil(deadline - self.scheduler.now())
+            self.scheduler_timer.start(max(delay, 0))
+
+    def start_game_loop(self):
+        """Start the frame timer with no game time pending"""
+        self.tick_accumulator = 0.0
+        self.last_frame_time = time.perf_counter()
+        self.render_alpha = 1.0
+        self.timer.start(self.frame_interval)
+
+    def run_frame(self):
+        """Run the engine ticks that are due and slide the snake towards its cells"""
+        now = time.perf_counter()
+        self.tick_accumulator += (now - self.last_frame_time) * 1000
+        self.last_frame_time = now
+        
+        # Where the snake is drawn now has to be repainted as well
+        region = self.snake_region()
+        
+        ticks = 0
+        while self.tick_accumulator >= self.engine.tick_interval and self.timer.is_active():
+            self.tick_accumulator -= self.engine.tick_interval
+            self.update_game()
+            ticks += 1
+            if ticks == self.max_catch_up_ticks:
+                # Catch up a few ticks after a stall, but don't try to replay it all
+                self.tick_accumulator %= self.engine.tick_interval
+        
+        if self.engine.game_over:
+            self.render_alpha = 1.0
+        else:
+            self.render_alpha = min(self.tick_accumulator / self.engine.tick_interval, 1.0)
+        self.update(region + self.snake_region())
+
+    def queue_turn(self, direction):
+        """Hand a turn to the engine, stamped with the time of the key press"""
+        if not self.engine.queue_turn(direction, time.perf_counter()):
             return
         
-        self.snake.insert(0, new_head)
-        
-        # Check if green crystal eaten
-        green_crystal_eaten = False
-        if new_head == self.food:
-            green_crystal_eaten = True
-            print("Green crystal eaten!")
-        
-        # Check if red crystal eaten - only in mission mode
-        red_crystal_eaten = False
-        red_crystal_index = None
-        
-        if hasattr(self, 'in_mission_mode') and self.in_mission_mode and hasattr(self, 'red_crystal_positions'):
-            # Debug collision detection with red crystals
-            for i, pos in enumerate(self.red_crystal_positions):
-                print(f"Checking red crystal {i} at {pos}, head at {new_head}")
-                if new_head[0] == pos[0] and new_head[1] == pos[1]:  # Use explicit comparison
-                    red_crystal_eaten = True
-                    red_crystal_index = i
-                    print(f"RED CRYSTAL EATEN at position {pos}!")
-                    break
-        
-        if green_crystal_eaten:
-            # Handle green crystal eaten
-            self.crystals_collected += 1
-            self.score += 1
-            
-            # Check if we should spawn red crystals at this milestone
-            self.spawn_red_crystals()
-            
-            # Create new green crystal
-            self.food = self.create_food()
-        
-        elif red_crystal_eaten:
-            # Apply slow effect - with explicit debug
-            print("APPLYING SLOW EFFECT")
-            
-            # Store original speed
-            self.original_speed = self.timer.interval()
-            print(f"Original speed (interval): {self.original_speed}ms")
-            
-            # Set new slower speed
-            new_speed = int(self.original_speed * 1.67)  # 40% slower
-            print(f"New slower speed (interval): {new_speed}ms")
-            self.timer.setInterval(new_speed)
-            
-            # Set slow effect status
-            self.slow_effect_active = True
-            
-            # Start timer to end slow effect
-            if hasattr(self, 'slow_timer'):
-                self.slow_timer.stop()  # Stop existing timer if any
-            
-            self.slow_timer = QTimer()
-            self.slow_timer.timeout.connect(self.end_slow_effect)
-            self.slow_timer.setSingleShot(True)
-            self.slow_timer.start(5000)  # 5 seconds
-            
-            # Remove eaten crystal
-            if red_crystal_index is not None:
-                self.red_crystals_eaten.add(self.red_crystal_positions[red_crystal_index])
-                self.red_crystal_positions.pop(red_crystal_index)
-            
-            # Update score
-            self.score += 1
+        if self.immediate_turns and len(self.engine.input_queue) == 1 and self.timer.is_active():
+            region = self.snake_region()
+            self.update_game()
+            if self.timer.is_active():
+                self.tick_accumulator = 0.0
+                self.last_frame_time = time.perf_counter()
+            self.render_alpha = 1.0
+            self.update(region + self.snake_region())
+
+    def snake_region(self):
+        """Widget region covering every cell the snake is drawn across"""
+        region = QRegion()
+        for pos in self.engine.snake:
+            region += self.cell_rect(pos)
+        if self.engine.vacated_tail is not None:
+            region += self.cell_rect(self.engine.vacated_tail)
+        return region
+
+    def update_game(self):
+        """Advance the engine by one tick and react to what happened"""
+        boulder_version = self.engine.boulder_version
+        events = self.engine.step()
+        self.recorder.record()
+        if self.engine.score >= self.checkpoint_score + self.checkpoint_points and not self.engine.game_over:
+            self.take_checkpoint()
+        
+        log = self.event_log
+        if log.level <= DEBUG:
+            log.record(DEBUG, 'tick', head=self.engine.snake[0], events=events)
+        
+        if self.engine.applied_input is not None:
+            self.input_latencies.append((time.perf_counter() - self.engine.applied_input[1]) * 1000)
+        
+        # Usually only a few cells changed: repaint just those, plus the HUD
+        # if its text changed. New boulders change the background layer.
+        if self.engine.boulder_version != boulder_version:
+            self.update()
+        else:
+            region = QRegion()
+            for pos in self.engine.changed_cells:
+                region += self.cell_rect(pos)
+            self.update(region)
+            self.update_hud()
+        
+        for event in events:
+            if event == GAME_OVER:
+                self.game_over_handler()
+            elif event == OXYGEN_LOW:
+                if log.level <= WARNING:
+                    log.record(WARNING, 'oxygen_low', oxygen=self.engine.oxygen_level)
+                # Start oxygen warning, playing immediately on first detection
+                self.oxygen_warning_timer.start()
+                self.play_oxygen_warning()
+            elif event == OXYGEN_RESTORED:
+                self.oxygen_warning_timer.stop()
+        self.sync_golden_apple_blink()
+
+    def cell_rect(self, pos):
+        """Widget rectangle covering a grid cell, with a pixel of slack for rounding"""
+        cell_size_x = self.size().width() / self.width
+        cell_size_y = self.size().height() / self.height
+        return QRect(round(pos[0] * cell_size_x) - 1, round(pos[1] * cell_size_y) - 1,
+                     math.ceil(cell_size_x) + 2, math.ceil(cell_size_y) + 2)
+
+    def update_hud(self):
+        """Repaint the HUD strip at the top of the screen if its text changed"""
+        engine = self.engine
+        if engine.in_mission_mode:
+            state = (engine.crystals_collected, int(engine.oxygen_level), engine.slow_effect_active)
         else:
-            # No crystal eaten, remove the last segment
-            self.snake.pop()
+            state = (engine.score, self.high_score, engine.golden_apple_active,
+                     engine.golden_apple_current_time, engine.slow_effect_active)
         
-        self.update()
+        if state != self.hud_state:
+            self.hud_state = state
+            cell_size_y = self.size().height() / self.height
+            self.update(0, 0, self.size().width(), math.ceil(MARGIN_TOP * cell_size_y))
 
     def reset_game(self):
         """Reset the game state"""
@@ -1345,29 +1285,29 @@ class SnakeGame(QMainWindow):
         if hasattr(self, 'pause_overlay') and self.pause_overlay:
             self.pause_overlay.setVisible(False)
         self.paused = False
+        self.scheduler.resume('game')
         
-        self.snake = [(self.width//2, self.height//2)]
-        self.direction = (1, 0)
-        
-        # Only clear boulders if not in mission mode
-        # For mission mode, boulders are cleared in start_mission_game
-        if not hasattr(self, 'in_mission_mode') or not self.in_mission_mode:
-            self.boulders = []
-        
-        self.food = self.create_food()
-        self.score = 0
-        self.game_over = False
+        boulder_count = self.boulder_count if self.obstacles_enabled else 0
+        self.engine.reset(boulder_count=boulder_count)
+        # The game runs on a fresh seeded stream; its turns are recorded for a replay
+        self.recorder = ReplayRecorder(self.engine, CASUAL, boulder_count=boulder_count)
+        self.take_checkpoint()
         self.new_high_score = False
+        self.current_level = 0  # Campaign levels set it again after the reset
+        if self.event_log.level <= INFO:
+            self.event_log.record(INFO, 'game_start', mode='casual', boulders=self.engine.boulder_count)
         
         # Stop animations
-        self.celebration_movie.stop()
-        self.high_score_blink_timer.stop()
-        self.score_animation_timer.stop()
-        self.score_animation = 0
+        if self.celebration_movie is not None:
+            self.celebration_movie.stop()
+        self.stop_game_over_animations()
+        self.oxygen_warning_timer.stop()
+        self.sync_golden_apple_blink()
         
-        # Make sure game timer is running
-        if not self.timer.isActive():
-            self.timer.start(100)
+        # Make sure game loop is running, with a fresh clock
+        self.start_game_loop()
+        
+        self.update()
 
     def keyPressEvent(self, event):
         """Handle key press events"""
@@ -1375,7 +1315,7 @@ class SnakeGame(QMainWindow):
         if event.key() == Qt.Key_Escape:
             # In mission intro screen - go back to campaign menu
             if self.in_mission_intro:
-                self.show_campaign_menu()
+                self.start_campaign_game()
                 return
             
             # In campaign menu - go back to game mode menu
@@ -1394,24 +1334,27 @@ class SnakeGame(QMainWindow):
                 return
             
             # In active game - toggle pause
-            elif not self.game_over and not self.in_main_menu:
+            elif not self.engine.game_over and not self.in_main_menu:
                 self.toggle_pause()
                 return
             
             # In game over screen - go to main menu
-            elif self.game_over:
+            elif self.engine.game_over:
                 self.show_main_menu()
                 return
         
         # If game over, also accept R to restart
-        if self.game_over:
+        if self.engine.game_over:
             if event.key() == Qt.Key_R:
                 # In mission mode, restart the mission
-                if hasattr(self, 'in_mission_mode') and self.in_mission_mode:
+                if self.engine.in_mission_mode:
                     self.reset_mission()
                 else:
                     self.reset_game()
                 return
+            elif event.key() == Qt.Key_C and self.checkpoint is not None:
+                self.retry_from_checkpoint()
+                return
             else:
                 # For mission complete, any key returns to menu
                 if hasattr(self, 'mission_completed') and self.mission_completed:
@@ -1425,44 +1368,49 @@ class SnakeGame(QMainWindow):
         if self.paused or self.in_main_menu or self.in_settings or self.in_game_mode_menu or self.in_campaign_menu or self.in_mission_intro:
             return
         
-        # Process directional keys for snake movement
+        # Process directional keys for snake movement (the engine queues them and refuses reversals)
         if event.key() == Qt.Key_Up or event.key() == Qt.Key_W:
-            if self.direction != (0, 1):  # Not moving down
-                self.direction = (0, -1)
+            self.queue_turn(UP)
         elif event.key() == Qt.Key_Down or event.key() == Qt.Key_S:
-            if self.direction != (0, -1):  # Not moving up
-                self.direction = (0, 1)
+            self.queue_turn(DOWN)
         elif event.key() == Qt.Key_Left or event.key() == Qt.Key_A:
-            if self.direction != (1, 0):  # Not moving right
-                self.direction = (-1, 0)
+            self.queue_turn(LEFT)
         elif event.key() == Qt.Key_Right or event.key() == Qt.Key_D:
-            if self.direction != (-1, 0):  # Not moving left
-                self.direction = (1, 0)
+            self.queue_turn(RIGHT)
 
     def toggle_pause(self):
         """Toggle the game's paused state"""
-        if self.in_main_menu or self.in_settings or self.in_game_mode_menu or self.game_over:
+        if self.in_main_menu or self.in_settings or self.in_game_mode_menu or self.engine.game_over:
             return  # Don't pause when in menus or game over
         
         self.paused = not self.paused
         
+        # Oxygen and other game clocks only advance with game ticks, so
+        # freezing the game timers pauses them too; the next tick keeps
+        # whatever was left of its interval
         if self.paused:
-            self.timer.stop()
-            # Also pause mission timer if active
-            if hasattr(self, 'mission_timer') and self.mission_timer.isActive():
-                self.mission_timer.stop()
+            self.scheduler.pause('game')
             # Show pause overlay
             self.pause_overlay.setGeometry(0, 0, self.size().width(), self.size().height())
             self.pause_overlay.setVisible(True)
             self.pause_overlay.raise_()
         else:
-            self.timer.start()
-            # Resume mission timer if in mission mode
-            if hasattr(self, 'in_mission_mode') and self.in_mission_mode:
-                self.mission_timer.start(1000)
+            # Time spent paused is not game time
+            self.last_frame_time = time.perf_counter()
+            self.scheduler.resume('game')
             # Hide pause overlay
             self.pause_overlay.setVisible(False)
 
+    def closeEvent(self, event):
+        """Write out anything still buffered and close files before the window goes away"""
+        self.save_running_game()
+        self.score_writer.close()
+        self.score_store.close()
+        self.event_log.close()
+        self.intros.shutdown()
+        self.assets.shutdown()
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         """Handle window resize events"""
         super().resizeEvent(event)
@@ -1472,74 +1420,160 @@ class SnakeGame(QMainWindow):
             # Use size() method instead of width()/height() to avoid conflict with instance variables
             self.pause_overlay.setGeometry(0, 0, self.size().width(), self.size().height())
         
-        # Make sure container fills the entire available space
-        self.container.setFixedSize(self.size().width(), self.size().height())
+        # Make sure the screen stack fills the entire available space
+        self.screens.setFixedSize(self.size().width(), self.size().height())
+        
+        # Sprites are sized for the old window; rebuild them on demand
+        self.sprite_cache.clear()
+
+
+    def saved_game_path(self):
+        return os.path.join(self.data_dir, 'saved_game.snapshot')
+
+    def game_running(self):
+        """Whether a game is on screen and not over, paused or not"""
+        return not (self.engine.game_over or self.in_main_menu or self.in_settings or
+                    self.in_game_mode_menu or self.in_campaign_menu or self.in_mission_intro)
+
+    def save_running_game(self):
+        """Keep the game in progress for the next launch"""
+        if not self.game_running():
+            return
+        try:
+            snapshot.save_game(self.saved_game_path(), self.engine, self.recorder.to_bytes())
+        except OSError as e:
+            self.event_log.record(ERROR, 'game_save_failed', error=str(e))
+
+    def remove_saved_game(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def resume_saved_game(self):
+        """Continue, paused, the game saved when the window was last closed"""
+        path = self.saved_game_path()
+        if not os.path.exists(path):
+            return
+        try:
+            state, replay_data = snapshot.load_game(path)
+            snapshot.restore(self.engine, state)
+            recorder = ReplayRecorder.resume(self.engine, replay_data)
+        except (OSError, snapshot.BoardSizeError) as e:
+            # Saved on a screen with a different board size, or not readable
+            # right now: keep it for a later launch
+            self.event_log.record(WARNING, 'game_resume_skipped', error=str(e))
+            return
+        except (ValueError, IndexError) as e:
+            # Damaged: it will never load, so drop it
+            self.event_log.record(WARNING, 'game_resume_failed', error=str(e))
+            self.engine.reset()
+            self.remove_saved_game(path)
+            return
+        # A saved game is resumed once
+        self.remove_saved_game(path)
+        
+        self.recorder = recorder
+        self.current_level = recorder.level if recorder.mode == LEVEL else 0
+        if recorder.mode == MISSION:
+            self.current_mission = 1
+            self.original_bg_color = self.bg_color
+            self.original_grid_color = self.grid_color
+            self.bg_color = QColor("#4f000b")
+            self.grid_color = QColor("#720026")
+        if self.event_log.level <= INFO:
+            self.event_log.record(INFO, 'game_resumed', mode=self.game_mode(), tick=self.engine.tick)
+        
+        self.screens.show_screen('game')
+        self.in_main_menu = False
+        self.take_checkpoint()
+        self.restore_game_view()
+        self.toggle_pause()
+
+    def take_checkpoint(self):
+        """Remember the current state to retry from"""
+        self.checkpoint = snapshot.dump(self.engine)
+        self.checkpoint_score = self.engine.score
+
+    def retry_from_checkpoint(self):
+        """Continue from the last checkpoint after a game over"""
+        snapshot.restore(self.engine, self.checkpoint)
+        self.recorder.rewind()
+        if self.event_log.level <= INFO:
+            self.event_log.record(INFO, 'checkpoint_retry', mode=self.game_mode(), tick=self.engine.tick)
+        self.restore_game_view()
+
+    def restore_game_view(self):
+        """Bring the screen and timers in line with a restored engine and run it"""
+        if self.pause_overlay:
+            self.pause_overlay.setVisible(False)
+        self.paused = False
+        self.scheduler.resume('game')
+        
+        self.new_high_score = False
+        self.mission_failed_flag = False
+        self.mission_completed = False
+        if self.celebration_movie is not None:
+            self.celebration_movie.stop()
+        self.stop_game_over_animations()
+        if self.engine.oxygen_warning_active:
+            self.oxygen_warning_timer.start()
+        else:
+            self.oxygen_warning_timer.stop()
+        self.sync_golden_apple_blink()
+        
+        self.start_game_loop()
+        self.update()
+        self.setFocus()
 
     def play_apple_sound(self, is_golden=False):
         """Play sound when apple is eaten"""
         if not self.sound_enabled:
             return
             
-        if is_golden:
-            self.sound_player.setMedia(self.golden_apple_sound)
-        else:
-            self.sound_player.setMedia(self.apple_sound)
-        
-        self.sound_player.setVolume(30)  # 30% volume
-        self.sound_player.play()
-        
-        # Stop sound after 0.5 seconds
-        self.sound_timer.start(500)
-
-    def stop_sound(self):
-        """Stop the current sound effect"""
-        self.sound_player.stop()
+        # Cut off after 0.5 seconds
+        self.audio.play('golden_apple' if is_golden else 'apple', 'effects', duration_ms=500)
 
     def game_over_handler(self):
         """Handle game over state"""
         # Stop all game timers
         self.timer.stop()
-        self.golden_apple_timer.stop()
         
-        # Stop oxygen warning timer and sounds
-        if hasattr(self, 'oxygen_warning_timer'):
-            self.oxygen_warning_timer.stop()
-            self.oxygen_warning_active = False
-            self.sound_player.stop()  # Stop any playing sounds
+        # Stop oxygen warning and blink timers and sounds
+        self.oxygen_warning_timer.stop()
+        self.golden_apple_blink_timer.stop()
+        self.audio.stop()  # Stop any playing sounds
         
         # Update high score
         self.update_high_score()
         
         # Flag for animation
-        self.new_high_score = (self.score == self.high_score and self.score > 0)
+        score = self.engine.score
+        
+        # Share of earlier games in this mode that scored lower, for the game
+        # over screen; the score writer works it out as it saves the game
+        # and on_score_ranked shows it
+        self.games_finished += 1
+        self.beaten_percent = None
+        if self.event_log.level <= INFO:
+            self.event_log.record(INFO, 'game_over', score=score, mode=self.game_mode())
+        self.new_high_score = (score == self.high_score and score > 0)
         
         # Start high score blinking if we have a new high score
         if self.new_high_score:
             self.high_score_blink_timer.start()
         
-        # Set game over flag
-        self.game_over = True
-        
         # Force redraw
         self.update()
         
-        # Save high score to file
+        # Queue the score and the replay for the background writer; the
+        # screen does not wait on disk
         self.save_high_score()
+        self.save_replay()
 
-    def _check_audio_ready(self):
-        """Check if audio system is ready and restart playback if needed"""
-        self.preload_attempts += 1
-        
-        # Stop preloading after 10 attempts or if we've played for 100ms
-        if self.preload_attempts >= 10:
-            self.sound_player.stop()
-            self.sound_player.setVolume(100)
-            self.preload_timer.stop()
-            return
-        
-        # If media player state indicates issues, try again
-        if self.sound_player.state() == QMediaPlayer.StoppedState:
-            self.sound_player.play()
+    def save_replay(self):
+        """Keep the replay of the game that just ended, written by the background writer"""
+        self.score_writer.write_file(os.path.join(self.data_dir, 'last_game.replay'), self.recorder.to_bytes())
 
     def setup_pause_overlay(self):
         """Setup the pause overlay with resume and return to menu buttons"""
@@ -1582,8 +1616,8 @@ class SnakeGame(QMainWindow):
         """
         
         # Resume button
-        resume_button = HoverButton("Resume", self, self.sound_player, lambda: self.sound_enabled)
-        resume_button.set_hover_sound(self.hover_sound)
+        resume_button = HoverButton("Resume", self, self.audio, lambda: self.sound_enabled)
+        resume_button.set_hover_sound('hover')
         resume_button.setFixedSize(200, 50)
         resume_button.setFont(QFont("Courier", 16))
         resume_button.setStyleSheet(button_style)
@@ -1593,8 +1627,8 @@ class SnakeGame(QMainWindow):
         pause_layout.addSpacing(20)
         
         # Menu button (only one)
-        menu_button = HoverButton("Menu", self, self.sound_player, lambda: self.sound_enabled)
-        menu_button.set_hover_sound(self.hover_sound)
+        menu_button = HoverButton("Menu", self, self.audio, lambda: self.sound_enabled)
+        menu_button.set_hover_sound('hover')
         menu_button.setFixedSize(200, 50)
         menu_button.setFont(QFont("Courier", 16))
         menu_button.setStyleSheet(button_style)
@@ -1645,8 +1679,8 @@ class SnakeGame(QMainWindow):
         """
         
         # Create and add the buttons with hover sound
-        self.casual_button = HoverButton("Casual", self, self.sound_player, lambda: self.sound_enabled)
-        self.casual_button.set_hover_sound(self.hover_sound)
+        self.casual_button = HoverButton("Casual", self, self.audio, lambda: self.sound_enabled)
+        self.casual_button.set_hover_sound('hover')
         self.casual_button.setFixedSize(200, 50)
         self.casual_button.setFont(QFont("Courier", 16))
         self.casual_button.setStyleSheet(button_style)
@@ -1657,8 +1691,8 @@ class SnakeGame(QMainWindow):
         layout.addSpacing(20)
         
         # Create Campaign button
-        self.campaign_button = HoverButton("Campaign", self, self.sound_player, lambda: self.sound_enabled)
-        self.campaign_button.set_hover_sound(self.hover_sound)
+        self.campaign_button = HoverButton("Campaign", self, self.audio, lambda: self.sound_enabled)
+        self.campaign_button.set_hover_sound('hover')
         self.campaign_button.setFixedSize(200, 50)
         self.campaign_button.setFont(QFont("Courier", 16))
         self.campaign_button.setStyleSheet(button_style)
@@ -1669,8 +1703,8 @@ class SnakeGame(QMainWindow):
         layout.addSpacing(20)
         
         # Create Back button
-        self.back_button = HoverButton("Back", self, self.sound_player, lambda: self.sound_enabled)
-        self.back_button.set_hover_sound(self.hover_sound)
+        self.back_button = HoverButton("Back", self, self.audio, lambda: self.sound_enabled)
+        self.back_button.set_hover_sound('hover')
         self.back_button.setFixedSize(200, 50)
         self.back_button.setFont(QFont("Courier", 16))
         self.back_button.setStyleSheet(button_style)
@@ -1682,6 +1716,7 @@ class SnakeGame(QMainWindow):
         
         # Set the layout
         self.game_mode_widget.setLayout(layout)
+        return self.game_mode_widget
 
     def setup_campaign_menu(self):
         """Setup the campaign level selection menu"""
@@ -1749,8 +1784,8 @@ class SnakeGame(QMainWindow):
         layout.addSpacing(50)
         
         # Back button (reddish-brown like active level)
-        back_button = HoverButton("Back", self, self.sound_player, lambda: self.sound_enabled)
-        back_button.set_hover_sound(self.hover_sound)
+        back_button = HoverButton("Back", self, self.audio, lambda: self.sound_enabled)
+        back_button.set_hover_sound('hover')
         back_button.setFixedSize(200, 60)
         back_button.setFont(QFont("Courier", 18, QFont.Bold))
         back_button.setStyleSheet("""
@@ -1768,104 +1803,20 @@ class SnakeGame(QMainWindow):
         
         # Set the layout
         self.campaign_widget.setLayout(layout)
+        return self.campaign_widget
 
-    def show_mission_intro(self):
-        """Show mission 1 intro screen with background and story"""
-        # Stop any running game timers
-        if self.timer.isActive():
-            self.timer.stop()
-        
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
+    def setup_mission_intro(self):
+        """Setup the mission 1 intro screen; background, title and story are pre-rendered"""
+        mission_widget = IntroScreen()
         
-        # Create widget for mission intro
-        mission_widget = QWidget()
-        
-        # Enable automatic background filling
-        mission_widget.setAutoFillBackground(True)
-        
-        # Build path relative to this file so it works on any machine
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        image_path = os.path.join(current_dir, 'asset', 'mission', 'mission 1', 'mission1_background.png')
-        pixmap = QPixmap(image_path)
-        if pixmap.isNull():
-            print("Failed to load image")
-            # Create checkerboard pattern with the requested colors for the first mission
-            mission_widget.setStyleSheet("""
-                background-color: #780000;
-                background-image: linear-gradient(45deg, #c1121f 25%, transparent 25%),
-                                  linear-gradient(-45deg, #c1121f 25%, transparent 25%),
-                                  linear-gradient(45deg, transparent 75%, #c1121f 75%),
-                                  linear-gradient(-45deg, transparent 75%, #c1121f 75%);
-                background-size: 60px 60px;
-                background-position: 0 0, 0 30px, 30px -30px, -30px 0px;
-            """)
-        else:
-            # Use image as background
-            palette = QPalette()
-            palette.setBrush(QPalette.Window, QBrush(pixmap.scaled(
-                self.width * self.cell_size,
-                self.height * self.cell_size,
-                Qt.KeepAspectRatioByExpanding,
-                Qt.SmoothTransformation
-            )))
-            mission_widget.setPalette(palette)
-        
-        # Create layout for mission intro
+        # Only the Next button is a live widget, at the bottom
         mission_layout = QVBoxLayout(mission_widget)
-        mission_layout.addSpacing(20)
-        
-        # Title with golden color
-        title_label = QLabel("Mission 1: The Awakening", self)
-        title_label.setFont(QFont("Courier", 30, QFont.Bold))
-        title_label.setStyleSheet("color: #FFCC00;")
-        title_label.setAlignment(Qt.AlignCenter)
-        mission_layout.addWidget(title_label)
-        
-        # Add space after title
-        mission_layout.addSpacing(10)
-        
-        # Create story text with better formatting for 720p
-        story_text = QLabel()
-        story_text.setWordWrap(True)
-        story_text.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        story_text.setStyleSheet("""
-            color: #00FF00;
-            background-color: rgba(0, 0, 0, 180);
-            padding: 40px;
-            border-radius: 15px;
-            font-family: Courier;
-            font-size: 15px;
-        """)
-        
-        # Use text formatting with HTML to make it more readable
-        story_html = """
-        <p><span style='color:#FFCC00; font-size:19px; font-weight:bold;'>Zeta Galaxy, a desolate planet called Xyra-9...</span></p>
-        <p>The cosmic serpent Nova awoke, its glowing eyes scanning the alien terrain. Its memory was blank—only a faint voice echoed in its mind:</p>
-        <p><span style='color:#AAAAFF; font-style:italic; font-size:15px;'>"Wake up... You are the last survivor..."</span></p>
-        <p>Beneath Nova lay a surface of celestial rocks, shimmering in hues of red and blue. Scattered across the land were crystals pulsating with an unknown energy. Yet, some of them emitted a strange red glow...</p>
-        <p><span style='color:#FF0000; font-size:17px; font-weight:bold;'>WARNING: Oxygen levels at 80% and dropping!</span></p>
-        <p><span style='color:#FFCC00; font-size:19px; font-weight:bold;'>Mission:</span></p>
-        <ul>
-        <li>Collect the green crystals to restore energy and strengthen your body.</li>
-        <li>Avoid the red crystals! They are toxic and will weaken you for a short time.</li>
-        <li>Navigate through the alien cliffs and uncover the truth that awaits you...</li>
-        </ul>
-        """
-        
-        story_text.setText(story_html)
-        story_text.setMinimumHeight(600)  # Increased height for 720p
-        mission_layout.addWidget(story_text, 1)
-        
+        mission_layout.addStretch(1)
         mission_layout.addSpacing(20)
         
         # Next button with brown/orange styling
-        next_button = HoverButton("Next", self, self.sound_player, lambda: self.sound_enabled)
-        next_button.set_hover_sound(self.hover_sound)
+        next_button = HoverButton("Next", self, self.audio, lambda: self.sound_enabled)
+        next_button.set_hover_sound('hover')
         next_button.setFixedSize(300, 70)
         next_button.setFont(QFont("Courier", 24, QFont.Bold))
         next_button.setStyleSheet("""
@@ -1879,10 +1830,20 @@ class SnakeGame(QMainWindow):
         mission_layout.addWidget(next_button, 0, Qt.AlignHCenter)
         
         mission_layout.addSpacing(10)
+        return mission_widget
+
+    def show_mission_intro(self):
+        """Show mission 1 intro screen with background and story"""
+        # Stop any running game timers
+        if self.timer.is_active():
+            self.timer.stop()
         
-        # Add and show mission intro
-        self.container_layout.addWidget(mission_widget)
-        mission_widget.show()
+        # Rendered while the campaign menu was up; this only waits if the
+        # level was clicked before the worker finished
+        self.apply_mission_intro(1, wait=True)
+        
+        # Show the mission intro, built on the first visit
+        self.screens.show_screen('mission_intro')
         
         # Update state flags
         self.in_main_menu = False
@@ -1895,17 +1856,31 @@ class SnakeGame(QMainWindow):
         # Make sure game is not running
         self.timer.stop()
 
+    def mission_intro_key(self, mission):
+        """Cache key of a mission intro at the current window size"""
+        return (mission, self.size().width(), self.size().height(), self.devicePixelRatioF())
+
+    def apply_mission_intro(self, mission, wait=False):
+        """Put the rendered intro on the intro screen, if it is ready (or wait)"""
+        key = self.mission_intro_key(mission)
+        future = self.intros.prefetch(*key)
+        if not wait and not future.done():
+            return
+        screen = self.screens.screen('mission_intro')
+        if screen.picture_key != key:
+            if self.intros.background_missing(mission):
+                self.event_log.record(ERROR, 'image_load_failed', asset=MISSIONS[mission]['background'])
+            screen.set_picture(key, future.result())
+
+    def on_intro_rendered(self, mission):
+        """Turn a freshly rendered intro into a pixmap before its level is clicked"""
+        if self.in_campaign_menu:
+            self.apply_mission_intro(mission)
+
     def start_mission_game(self):
         """Start the mission game after intro"""
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
-        
-        # Reset game state
-        self.reset_game()
+        # Switch to the empty page the game is drawn under
+        self.screens.show_screen('game')
         
         # Set mission-specific background colors and elements
         # Store the original colors to restore them later
@@ -1922,75 +1897,23 @@ class SnakeGame(QMainWindow):
         self.in_game_mode_menu = False
         self.in_campaign_menu = False
         self.in_mission_intro = False
-        self.in_mission_mode = True  # Add this flag to track if we're in mission mode
         self.current_mission = 1     # Track which mission we're in
         
-        # Initialize crystal count for mission
-        self.crystals_collected = 0
-        self.crystals_required = 20  # Need 20 crystals to complete mission 1
-        
-        # Clear all boulders and make sure they won't appear
-        self.boulders = []
-        self.boulder_count = 0
-        self.obstacles_enabled = False
-        
-        # Reset and start oxygen depletion
-        self.oxygen_level = 80  # Start with 80% oxygen
-        self.mission_timer.start(1000)  # Update every 1000ms (1 second)
-        
-        # Create new food without boulders
-        self.food = self.create_food()
-        
-        # Start the game timer
-        self.paused = False
-        self.timer.start(122)  # Slightly slower for mission 1
+        # Start mission 1: no boulders, 80% oxygen, 20 crystals to collect,
+        # slightly slower than casual; this also starts the game timer
+        self.reset_mission()
         
         # Set focus to the game
         self.setFocus()
 
-    def update_oxygen_level(self):
-        """Update oxygen level and handle low oxygen warnings"""
-        # Reduce oxygen by a small amount each time
-        oxygen_depletion_per_second = 100 / self.oxygen_depletion_time
-        self.oxygen_level -= oxygen_depletion_per_second
-        
-        # Ensure oxygen doesn't go below 0
-        if self.oxygen_level < 0:
-            self.oxygen_level = 0
-        
-        # Check if oxygen is below 30% threshold
-        if self.oxygen_level < 30 and not self.oxygen_warning_active:
-            # Start oxygen warning
-            self.oxygen_warning_active = True
-            self.oxygen_warning_timer.start()
-            self.play_oxygen_warning()  # Play immediately on first detection
-            print("Oxygen low! Warning activated.")
-        
-        # Check if oxygen is above 30% threshold and warnings are active
-        elif self.oxygen_level >= 30 and self.oxygen_warning_active:
-            # Stop oxygen warnings
-            self.oxygen_warning_active = False
-            self.oxygen_warning_timer.stop()
-            print("Oxygen restored to safe levels. Warning deactivated.")
-        
-        # Force a redraw to update the oxygen display
-        self.update()
-        
-        # If oxygen runs out, game over
-        if self.oxygen_level <= 0:
-            self.game_over_handler()
-
     def play_oxygen_warning(self):
         """Play the oxygen warning sound"""
-        if self.sound_enabled and self.oxygen_warning_active:
-            print("Playing oxygen warning sound!")
-            self.sound_player.setMedia(self.oxygen_warning_sound)
-            self.sound_player.setVolume(40)  # Set to 40% volume
-            self.sound_player.play()
+        if self.sound_enabled and self.engine.oxygen_warning_active:
+            self.audio.play('oxygen', 'alerts')
 
     def mission_failed(self):
         """Handle mission failure due to oxygen depletion"""
-        self.game_over = True
+        self.engine.game_over = True
         self.timer.stop()
         
         # Special flag for mission failure
@@ -2001,12 +1924,9 @@ class SnakeGame(QMainWindow):
 
     def mission_complete(self):
         """Handle mission completion"""
-        self.game_over = True
+        self.engine.game_over = True
         self.timer.stop()
         
-        # Stop the mission timer
-        self.mission_timer.stop()
-        
         # We'll show a special completion screen
         self.mission_completed = True
         self.mission_failed_flag = False
@@ -2019,144 +1939,52 @@ class SnakeGame(QMainWindow):
         if hasattr(self, 'pause_overlay') and self.pause_overlay:
             self.pause_overlay.setVisible(False)
         self.paused = False
-        
-        # Reset snake
-        self.snake = [(self.width//2, self.height//2)]
-        self.direction = (1, 0)
+        self.scheduler.resume('game')
         
         # Clear mission-specific flags
         self.mission_failed_flag = False
         self.mission_completed = False
         
-        # Reset crystal counts
-        self.crystals_collected = 0
-        
-        # Reset and restart the mission timer
-        self.mission_time_remaining = 120
-        self.mission_timer.start(1000)
-        
-        # New food
-        self.food = self.create_food()
-        self.score = 0
-        self.game_over = False
-        
-        # Make sure game timer is running
-        if not self.timer.isActive():
-            self.timer.start(100)
-
-    def end_slow_effect(self):
-        """End the slow effect and restore normal speed"""
-        # Only restore if the effect is active
-        if self.slow_effect_active:
-            # Restore original speed
-            self.timer.setInterval(self.original_speed)
-            
-            # Reset slow effect status
-            self.slow_effect_active = False
-            
-            print("Slow effect ended, speed restored to normal")
-
-    def spawn_red_crystals(self):
-        """Spawn red crystals at certain milestones"""
-        # Skip if not in mission mode
-        if not hasattr(self, 'in_mission_mode') or not self.in_mission_mode:
-            return
+        # Fresh snake, crystals and oxygen
+        self.engine.start_mission()
+        self.recorder = ReplayRecorder(self.engine, MISSION)
+        self.take_checkpoint()
+        self.new_high_score = False
+        if self.event_log.level <= INFO:
+            self.event_log.record(INFO, 'game_start', mode='mission', crystals_required=self.engine.crystals_required)
+        self.stop_game_over_animations()
+        self.oxygen_warning_timer.stop()
+        self.sync_golden_apple_blink()
         
-        # Check if we've reached a milestone for spawning red crystals
-        milestones = [0, 2, 5, 10, 15]
+        # Make sure game timer is running at mission speed
+        self.start_game_loop()
         
-        if self.crystals_collected in milestones:
-            print(f"MILESTONE REACHED: {self.crystals_collected} crystals - spawning red crystals")
-            
-            # Determine how many red crystals to spawn
-            num_to_spawn = 2  # Base 2 red crystals per milestone
-            
-            # Create the specified number of red crystals
-            for _ in range(num_to_spawn):
-                self.spawn_single_red_crystal()
+        self.update()
 
     def draw_red_crystals(self, qp, cell_size_x, cell_size_y):
         """Draw red crystals on the game board"""
         # Skip if not in mission mode
-        if not hasattr(self, 'in_mission_mode') or not self.in_mission_mode:
+        if not self.engine.in_mission_mode:
             return
         
         # Draw each red crystal
-        if hasattr(self, 'red_crystal_positions'):
-            for pos in self.red_crystal_positions:
-                x = round(pos[0] * cell_size_x)
-                y = round(pos[1] * cell_size_y)
-                
-                # Draw the red crystal image if it exists
-                if 'red_crystal' in self.mission_images and not self.mission_images['red_crystal'].isNull():
-                    crystal_width = round(cell_size_x)
-                    crystal_height = round(cell_size_y)
-                    
-                    red_crystal_img = self.mission_images['red_crystal'].scaled(
-                        crystal_width, crystal_height,
-                        Qt.IgnoreAspectRatio, Qt.SmoothTransformation
-                    )
-                    qp.drawImage(x, y, red_crystal_img)
-
-    def initialize_red_crystals(self):
-        """Generate initial two red crystals at random positions"""
-        print("Initializing first two red crystals at game start")
-        
-        # Generate 2 random positions for initial red crystals
-        initial_positions = []
-        attempts = 0
-        
-        # Try to find good positions (not on snake or green crystal)
-        while len(initial_positions) < 2 and attempts < 50:
-            attempts += 1
+        for pos in self.engine.red_crystal_positions:
+            x = round(pos[0] * cell_size_x)
+            y = round(pos[1] * cell_size_y)
             
-            # Generate random position
-            x = random.randint(2, self.width - 3)  # Stay away from edges
-            y = random.randint(2, self.height - 3)
-            pos = (x, y)
-            
-            # Check if position is valid (not on snake, not on green crystal)
-            if (pos not in self.snake and 
-                pos != self.food and 
-                pos not in initial_positions):
-                
-                initial_positions.append(pos)
-                print(f"Added initial red crystal at {pos}")
-        
-        # Set these as our red crystal positions
-        self.red_crystal_positions = initial_positions
-        print(f"Initial red crystal positions: {self.red_crystal_positions}")
-
-    def spawn_single_red_crystal(self):
-        """Generate a single red crystal at a random position"""
-        # Generate a random position that is not on the snake or the food
-        while True:
-            x = random.randint(2, self.width - 3)  # Stay away from edges
-            y = random.randint(2, self.height - 3)
-            pos = (x, y)
-            if pos not in self.snake and pos != self.food:
-                self.red_crystal_positions.append(pos)
-                print(f"Added new red crystal at {pos}")
-                break
+            # Draw the red crystal image if it exists
+            red_crystal_img = self.get_sprite('red_crystal', round(cell_size_x), round(cell_size_y))
+            if not red_crystal_img.isNull():
+                qp.drawPixmap(x, y, red_crystal_img)
 
     def start_normal_game(self):
         """Start normal (score-based) game mode"""
-        # Hide all widgets first
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.hide()
-                self.container_layout.removeWidget(widget)
+        # Switch to the empty page the game is drawn under
+        self.screens.show_screen('game')
         
-        # Reset game state
+        # Reset game state (this also leaves mission mode and clears red crystals)
         self.reset_game()
         
-        # Make sure we're not in mission mode
-        self.in_mission_mode = False
-        
-        # Clear red crystals specifically for normal mode
-        self.red_crystal_positions = []
-        
         # Update state flags
         self.in_main_menu = False
         self.in_settings = False
@@ -2164,33 +1992,27 @@ class SnakeGame(QMainWindow):
         
         # Start the game timer
         self.paused = False
-        self.timer.start(100)  # Adjust speed as needed
+        self.start_game_loop()
         
         # Set focus to the game
         self.setFocus()
 
 class HoverButton(QPushButton):
-    def __init__(self, text, parent=None, sound_player=None, sound_enabled_func=None):
+    def __init__(self, text, parent=None, audio=None, sound_enabled_func=None):
         super().__init__(text, parent)
-        self.sound_player = sound_player
+        self.audio = audio
         self.sound_enabled_func = sound_enabled_func
         self.hover_sound = None
-        self.sound_timer = parent.sound_timer if parent else None
         
     def set_hover_sound(self, sound):
         self.hover_sound = sound
         
     def enterEvent(self, event):
         # Play hover sound if enabled
-        if (self.sound_player and self.hover_sound and 
+        if (self.audio and self.hover_sound and 
             self.sound_enabled_func and self.sound_enabled_func()):
-            self.sound_player.setMedia(self.hover_sound)
-            self.sound_player.setVolume(30)  # 30% volume
-            self.sound_player.play()
-            
-            # Stop sound after 0.5 seconds if timer exists
-            if self.sound_timer:
-                self.sound_timer.start(500)
+            # Cut off after 0.5 seconds
+            self.audio.play(self.hover_sound, 'ui', duration_ms=500)
                 
         super().enterEvent(event)
 
@@ -0,0 +1,215 @@
+"""Binary snapshots of a GameState.
+
+A snapshot holds everything the engine needs to carry on exactly as if
+it had never stopped: the snake, food, boulders with their image index,
+crystals, oxygen, golden apple and slow effect timers, the grid, the
+free-cell index in its current order (random picks depend on it) and
+the position of the game's random stream.
+
+Scalars are packed with struct, cell lists as arrays of 32-bit cell
+indices, and the result is zlib-compressed; a game in progress is
+usually a few kilobytes. Snapshots carry no turn still waiting in the
+input queue.
+
+save_game/load_game keep a suspended game in a file: the snapshot
+followed by the game's replay so far.
+"""
+import os
+import struct
+import zlib
+from array import array
+
+from snake_engine import RED_CRYSTAL, CellIndex, GameRandom, UP, DOWN, LEFT, RIGHT
+
+MAGIC = b'SNKS'
+VERSION = 1
+
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+# Saved game file: magic and snapshot length
+SAVED_MAGIC = b'SNKG'
+SAVED_GAME = struct.Struct('<4sI')
+
+# width, height, tick, game_time, score, flags, direction, seed, rng state,
+# boulder_variants, boulder_count, base_interval, apples_eaten,
+# golden_apple_timer_value, golden_apple_current_time, golden_apple_elapsed,
+# slow_effect_remaining, slow_effect_duration, crystals_collected,
+# crystals_required, oxygen_elapsed, oxygen_depletion_time, oxygen_level,
+# food x, food y, then the lengths of: snake, boulders, red crystals,
+# eaten red crystals, crystal milestones, free cells
+SCALARS = struct.Struct('<IIIQIBBQQBIHIHhIiIHHIHdiiIIIIII')
+
+FLAGS = ('game_over', 'golden_apple_active', 'golden_apple_spawned_in_current_basket',
+         'slow_effect_active', 'in_mission_mode', 'oxygen_warning_active', 'obstacles_enabled')
+
+
+class BoardSizeError(ValueError):
+    """The snapshot was taken on a board of another size"""
+
+
+def cells(engine, positions):
+    width = engine.width
+    return array('I', [y * width + x for x, y in positions])
+
+
+def positions(engine, indices):
+    width = engine.width
+    return [(index % width, index // width) for index in indices]
+
+
+def dump(engine):
+    """Snapshot of the engine's state as bytes"""
+    flags = 0
+    for bit, name in enumerate(FLAGS):
+        if getattr(engine, name):
+            flags |= 1 << bit
+
+    boulders = array('I')
+    for boulder_cells, image in engine.boulders:
+        x, y = boulder_cells[0]  # Top-left; the rest follow from it
+        boulders.append(y * engine.width + x)
+        boulders.append(image)
+    snake = cells(engine, engine.snake)
+    red_crystals = cells(engine, engine.red_crystal_positions)
+    eaten = cells(engine, sorted(engine.red_crystals_eaten))
+    milestones = array('I', engine.crystal_milestones)
+    free_cells = array('I', engine.free_cells.cells)
+
+    header = SCALARS.pack(
+        engine.width, engine.height, engine.tick, engine.game_time, engine.score, flags,
+        DIRECTIONS.index(engine.direction), engine.seed, engine.rng.getstate(),
+        engine.boulder_variants, engine.boulder_count, engine.base_interval, engine.apples_eaten,
+        engine.golden_apple_timer_value, engine.golden_apple_current_time, engine.golden_apple_elapsed,
+        engine.slow_effect_remaining, engine.slow_effect_duration, engine.crystals_collected,
+        engine.crystals_required, engine.oxygen_elapsed, engine.oxygen_depletion_time,
+        engine.oxygen_level, engine.food[0], engine.food[1],
+        len(snake), len(boulders) // 2, len(red_crystals), len(eaten), len(milestones), len(free_cells))
+    body = b''.join((header, engine.grid, snake.tobytes(), boulders.tobytes(), red_crystals.tobytes(),
+                     eaten.tobytes(), milestones.tobytes(), free_cells.tobytes()))
+    return MAGIC + bytes((VERSION,)) + zlib.compress(body, 1)
+
+
+def restore(engine, data):
+    """Put the engine in the state of a snapshot taken on a board of the same size
+
+    Raises ValueError, leaving the engine untouched, if the snapshot is
+    damaged or for another board size.
+    """
+    if data[:4] != MAGIC or data[4:5] != bytes((VERSION,)):
+        raise ValueError('not a game snapshot')
+    try:
+        body = zlib.decompress(data[5:])
+    except zlib.error as e:
+        raise ValueError(f'corrupt game snapshot: {e}') from None
+    if len(body) < SCALARS.size:
+        raise ValueError('truncated game snapshot')
+    scalars = SCALARS.unpack_from(body)
+    (width, height, tick, game_time, score, flags, direction, seed,
+     rng_state, boulder_variants, boulder_count, base_interval, apples_eaten,
+     golden_apple_timer_value, golden_apple_current_time, golden_apple_elapsed,
+     slow_effect_remaining, slow_effect_duration, crystals_collected,
+     crystals_required, oxygen_elapsed, oxygen_depletion_time,
+     oxygen_level, food_x, food_y,
+     snake_length, boulder_total, red_crystal_count, eaten_count, milestone_count,
+     free_count) = scalars
+    if (width, height) != (engine.width, engine.height):
+        raise BoardSizeError(f'snapshot is for a {width}x{height} board')
+
+    # Everything is read and checked before the engine is touched
+    size = width * height
+    cell_values = snake_length + 2 * boulder_total + red_crystal_count + eaten_count + milestone_count + free_count
+    if len(body) != SCALARS.size + size + 4 * cell_values:
+        raise ValueError('truncated game snapshot')
+    if direction >= len(DIRECTIONS) or not snake_length:
+        raise ValueError('corrupt game snapshot')
+
+    offset = SCALARS.size
+    grid = bytearray(body[offset:offset + size])
+    offset += size
+
+    def take(count):
+        nonlocal offset
+        values = array('I')
+        values.frombytes(body[offset:offset + 4 * count])
+        offset += 4 * count
+        return values
+
+    snake = take(snake_length)
+    boulders = take(2 * boulder_total)
+    red_crystals = take(red_crystal_count)
+    eaten = take(eaten_count)
+    milestones = take(milestone_count)
+    free_cells = take(free_count)
+
+    corners = boulders[0::2]
+    images = boulders[1::2]
+    if (max(grid, default=0) > RED_CRYSTAL or food_x >= width or food_y >= height
+            or max(snake) >= size
+            or any(max(cells, default=0) >= size for cells in (red_crystals, eaten, free_cells))
+            or any(corner % width >= width - 1 or corner // width >= height - 1 for corner in corners)
+            or max(images, default=0) >= boulder_variants):
+        raise ValueError('corrupt game snapshot')
+
+    (engine.tick, engine.game_time, engine.score, engine.seed,
+     engine.boulder_variants, engine.boulder_count, engine.base_interval, engine.apples_eaten,
+     engine.golden_apple_timer_value, engine.golden_apple_current_time, engine.golden_apple_elapsed,
+     engine.slow_effect_remaining, engine.slow_effect_duration, engine.crystals_collected,
+     engine.crystals_required, engine.oxygen_elapsed, engine.oxygen_depletion_time,
+     engine.oxygen_level) = (
+        tick, game_time, score, seed,
+        boulder_variants, boulder_count, base_interval, apples_eaten,
+        golden_apple_timer_value, golden_apple_current_time, golden_apple_elapsed,
+        slow_effect_remaining, slow_effect_duration, crystals_collected,
+        crystals_required, oxygen_elapsed, oxygen_depletion_time,
+        oxygen_level)
+    for bit, name in enumerate(FLAGS):
+        setattr(engine, name, bool(flags & (1 << bit)))
+    engine.direction = DIRECTIONS[direction]
+    engine.food = (food_x, food_y)
+    engine.rng = GameRandom()
+    engine.rng.setstate(rng_state)
+    engine.grid = grid
+
+    # Same deque object: views keep a reference to it
+    engine.snake.clear()
+    engine.snake.extend(positions(engine, snake))
+
+    engine.boulders = []
+    for corner, image in zip(corners, images):
+        x, y = corner % width, corner // width
+        engine.boulders.append(([(x, y), (x + 1, y), (x, y + 1), (x + 1, y + 1)], image))
+    engine.boulder_version += 1
+
+    engine.red_crystal_positions = positions(engine, red_crystals)
+    engine.red_crystals_eaten = set(positions(engine, eaten))
+    engine.crystal_milestones = list(milestones)
+    engine.free_cells = CellIndex(size, free_cells)
+
+    engine.changed_cells.clear()
+    engine.vacated_tail = None
+    engine.input_queue.clear()
+    engine.applied_input = None
+
+
+def save_game(path, engine, replay_data):
+    """Write a game in progress to a file: its snapshot and its replay so far"""
+    state = dump(engine)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(SAVED_GAME.pack(SAVED_MAGIC, len(state)))
+        f.write(state)
+        f.write(replay_data)
+    os.replace(temporary_path, path)
+
+
+def load_game(path):
+    """(snapshot, replay data) of a game written by save_game"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < SAVED_GAME.size:
+        raise ValueError('not a saved game')
+    magic, length = SAVED_GAME.unpack_from(data)
+    if magic != SAVED_MAGIC:
+        raise ValueError('not a saved game')
+    start = SAVED_GAME.size
+    return data[start:start + length], data[start + length:]
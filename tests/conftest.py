@@ -0,0 +1,45 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The game's modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snake_engine import BOULDER, SNAKE, UP, DOWN, LEFT, RIGHT  # noqa: E402
+
+
+def play(engine, ticks, rng, turn_chance=0.3):
+    """Step engine up to ticks times; stops at game over
+
+    The snake heads for the food, avoiding its body and boulders, and
+    takes a random safe turn now and then.
+    """
+    for _ in range(ticks):
+        if engine.game_over:
+            break
+        engine.queue_turn(choose_direction(engine, rng, turn_chance))
+        engine.step()
+    return engine
+
+
+def choose_direction(engine, rng, turn_chance):
+    (x, y), (food_x, food_y) = engine.snake[0], engine.food
+    reverse = (-engine.direction[0], -engine.direction[1])
+    safe = []
+    for direction in (UP, DOWN, LEFT, RIGHT):
+        target = ((x + direction[0]) % engine.width, (y + direction[1]) % engine.height)
+        if direction != reverse and engine.cell_at(target) not in (SNAKE, BOULDER):
+            safe.append(direction)
+    if not safe:
+        return engine.direction
+    if rng.random() < turn_chance:
+        return rng.choice(safe)
+    toward = [d for d in safe if d[0] * (food_x - x) > 0 or d[1] * (food_y - y) > 0]
+    return toward[0] if toward else safe[0]
+
+
+@pytest.fixture
+def rng():
+    return random.Random(1234)
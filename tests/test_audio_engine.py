@@ -0,0 +1,79 @@
+import math
+import random
+from array import array
+
+import pytest
+
+import audio_engine
+from audio_engine import CHANNELS, FRAME_BYTES, RATE, AudioEngine, NullSink, PcmConverter, convert_pcm
+
+
+@pytest.fixture(params=['audioop', 'array'])
+def backend(request, monkeypatch):
+    """Run a test with audioop, where it exists, and with the array fallback"""
+    if request.param == 'audioop':
+        if audio_engine.audioop is None:
+            pytest.skip('audioop is not available')
+    else:
+        monkeypatch.setattr(audio_engine, 'audioop', None)
+    return request.param
+
+
+def tone(frequency, rate, seconds, channels=1, amplitude=12000):
+    values = array('h')
+    for i in range(int(rate * seconds)):
+        value = int(amplitude * math.sin(2 * math.pi * frequency * i / rate))
+        values.extend([value] * channels)
+    return values.tobytes()
+
+
+def test_mix_applies_volumes_and_clips(backend):
+    engine = AudioEngine(voices=4)
+    engine.attach(NullSink())
+    engine.add_sound('loud', array('h', [30000, -30000] * 100).tobytes())
+    engine.set_channel_volume('ui', 0.5)
+    engine.play('loud', 'effects')
+    engine.play('loud', 'effects')
+    engine.play('loud', 'ui')
+
+    mixed = array('h', engine.sink.pull(10))
+    assert len(mixed) == RATE // 100 * CHANNELS
+    assert mixed[0] == 32767 and mixed[1] == -32768  # Clipped, not wrapped
+    assert list(mixed[200:]) == [0] * (len(mixed) - 200)  # Silence after the sounds end
+    assert not engine.is_playing()
+
+
+def test_fallback_matches_audioop(monkeypatch):
+    if audio_engine.audioop is None:
+        pytest.skip('audioop is not available')
+    rng = random.Random(1)
+    quiet = [array('h', [rng.randrange(-8000, 8000) for _ in range(2000)]).tobytes() for _ in range(3)]
+    wide = array('i', [rng.randrange(-2 ** 31, 2 ** 31) for _ in range(500)]).tobytes()
+    chunks = [(quiet[0], 1.0), (quiet[1], 0.3), (quiet[2], 0.12)]
+    expected = (audio_engine.mix_chunks(chunks), audio_engine.to_stereo(quiet[0]),
+                audio_engine.to_16bit(wide, 4), audio_engine.to_16bit(wide, 1))
+    monkeypatch.setattr(audio_engine, 'audioop', None)
+    assert (audio_engine.mix_chunks(chunks), audio_engine.to_stereo(quiet[0]),
+            audio_engine.to_16bit(wide, 4), audio_engine.to_16bit(wide, 1)) == expected
+
+
+def test_resampling_in_chunks_matches_one_pass(backend):
+    data = tone(440, 22050, 0.5)
+    whole = convert_pcm(data, 1, 22050, 2)
+    assert abs(len(whole) // FRAME_BYTES - RATE // 2) <= 2
+
+    converter = PcmConverter(1, 22050, 2)
+    pieces = []
+    for start in range(0, len(data), 882):
+        pieces.append(converter.convert(data[start:start + 882]))
+    assert b''.join(pieces) == whole
+
+
+def test_resampled_tone_is_smooth(backend):
+    # A 440 Hz tone never jumps by more than a few steps between frames
+    converter = PcmConverter(1, 22050, 2)
+    data = tone(440, 22050, 0.2)
+    out = array('h', b''.join(converter.convert(data[i:i + 500]) for i in range(0, len(data), 500)))
+    left = out[0::2]
+    step = 2 * math.pi * 440 / RATE * 12000
+    assert max(abs(left[i + 1] - left[i]) for i in range(len(left) - 1)) < 1.5 * step
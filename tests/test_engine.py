@@ -0,0 +1,152 @@
+import random
+
+import pytest
+
+from conftest import choose_direction, play
+from snake_engine import (
+    BOULDER, DOWN, EMPTY, FOOD, FOOD_EATEN, GAME_OVER, LEFT, RED_CRYSTAL, RIGHT, SNAKE, UP, GameState,
+)
+
+
+def check_grid(engine):
+    """The occupancy grid and the free-cell index agree with the entities"""
+    width = engine.width
+    expected = bytearray(width * engine.height)
+    for x, y in engine.snake:
+        expected[y * width + x] = SNAKE
+    for cells, _ in engine.boulders:
+        for x, y in cells:
+            expected[y * width + x] = BOULDER
+    for x, y in engine.red_crystal_positions:
+        expected[y * width + x] = RED_CRYSTAL
+    x, y = engine.food
+    expected[y * width + x] = FOOD
+    assert engine.grid == expected
+
+    free = {i for i in range(engine.playfield_start, len(expected)) if expected[i] == EMPTY}
+    assert set(engine.free_cells.cells) == free
+    assert len(engine.free_cells.cells) == len(free)
+    for slot, cell in enumerate(engine.free_cells.cells):
+        assert engine.free_cells.slots[cell] == slot
+
+
+def test_reversing_is_ignored():
+    engine = GameState(22, 17, rng=random.Random(1))
+    engine.reset(boulder_count=0)
+    x, y = engine.snake[0]
+    engine.step(LEFT)
+    assert engine.direction == RIGHT
+    assert engine.snake[0] == (x + 1, y)
+
+
+def test_queued_turns_apply_one_per_tick():
+    engine = GameState(22, 17, rng=random.Random(1))
+    engine.reset(boulder_count=0)
+    x, y = engine.snake[0]
+    assert engine.queue_turn(UP, timestamp=1.5)
+    assert engine.queue_turn(LEFT, timestamp=2.5)
+
+    engine.step()
+    assert engine.direction == UP
+    assert engine.applied_input == (UP, 1.5)
+    assert engine.snake[0] == (x, y - 1)
+    engine.step()
+    assert engine.direction == LEFT
+    assert engine.applied_input == (LEFT, 2.5)
+    assert engine.snake[0] == (x - 1, y - 1)
+    engine.step()
+    assert engine.applied_input is None
+
+
+def test_reversal_within_one_tick_is_refused():
+    engine = GameState(22, 17, rng=random.Random(1))
+    engine.reset(boulder_count=0)
+    # Moving right: left would reverse, right changes nothing
+    assert not engine.queue_turn(LEFT)
+    assert not engine.queue_turn(RIGHT)
+    # Up then down inside one tick would reverse the snake too
+    assert engine.queue_turn(UP)
+    assert not engine.queue_turn(DOWN)
+    assert engine.queue_turn(LEFT)
+    assert engine.queue_turn(DOWN)
+    # The queue is full
+    assert not engine.queue_turn(RIGHT)
+
+    for _ in range(3):
+        engine.step()
+        assert not engine.game_over
+    assert engine.direction == DOWN
+
+
+def test_snake_wraps_around_the_board():
+    engine = GameState(22, 17, rng=random.Random(2))
+    engine.reset(boulder_count=0)
+    start = engine.snake[0]
+    engine.step(UP)
+    for _ in range(engine.height):
+        engine.step()
+    assert not engine.game_over
+    assert engine.snake[0] == (start[0], start[1] - 1)
+
+
+def test_snake_grows_by_one_per_food(rng):
+    engine = GameState(22, 17, rng=random.Random(3))
+    engine.reset(boulder_count=4)
+    eaten = 0
+    for _ in range(500):
+        if engine.game_over:
+            break
+        eaten += engine.step(choose_direction(engine, rng, 0.1)).count(FOOD_EATEN)
+        assert len(engine.snake) == 1 + eaten == 1 + engine.score
+    assert eaten > 0
+
+
+def test_mission_ends_when_oxygen_runs_out():
+    engine = GameState(22, 17, rng=random.Random(4))
+    engine.start_mission(oxygen=3)
+    events = []
+    for _ in range(100):
+        events += engine.step()
+        if engine.game_over:
+            break
+    assert events[-1] == GAME_OVER
+    assert engine.oxygen_level == 0
+
+
+@pytest.mark.parametrize('mode', ['casual', 'level', 'mission'])
+def test_grid_matches_entities_during_play(mode):
+    rng = random.Random(7)
+    for game in range(5):
+        engine = GameState(22, 17, rng=random.Random(game))
+        if mode == 'mission':
+            engine.start_mission()
+        else:
+            engine.reset(boulder_count=6)
+            if mode == 'level':
+                engine.configure_level(3)
+        check_grid(engine)
+        for _ in range(80):
+            if engine.game_over:
+                break
+            play(engine, 25, rng)
+            check_grid(engine)
+
+
+def test_same_rng_same_game():
+    games = []
+    for _ in range(2):
+        engine = GameState(22, 17, rng=random.Random(99))
+        engine.reset(boulder_count=4)
+        play(engine, 500, random.Random(3))
+        games.append((list(engine.snake), engine.food, engine.boulders, engine.score, bytes(engine.grid)))
+    assert games[0] == games[1]
+
+
+def test_same_seed_same_game():
+    games = []
+    for _ in range(2):
+        engine = GameState(22, 17)
+        engine.reset(boulder_count=4, seed=99)
+        play(engine, 500, random.Random(3))
+        games.append((list(engine.snake), engine.food, engine.boulders, engine.score, bytes(engine.grid)))
+    assert games[0] == games[1]
@@ -0,0 +1,56 @@
+import json
+
+from event_log import DEBUG, INFO, OFF, WARNING, EventLog
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_log_without_a_file_is_off():
+    log = EventLog()
+    assert log.level == OFF
+    assert log.thread is None
+    log.record(WARNING, 'oxygen_low')
+    assert log.recorded == 0
+    log.close()
+
+
+def test_records_below_the_level_are_skipped(tmp_path):
+    path = str(tmp_path / 'events.jsonl')
+    log = EventLog(path, level=INFO)
+    log.record(DEBUG, 'tick', head=[3, 4])
+    log.record(INFO, 'game_start', mode='casual')
+    log.record(WARNING, 'oxygen_low', oxygen=29.5)
+    log.close()
+
+    records = read_records(path)
+    assert [(r['level'], r['event']) for r in records] == [('info', 'game_start'), ('warning', 'oxygen_low')]
+    assert records[1]['oxygen'] == 29.5
+    assert log.level == OFF
+
+
+def test_records_are_written_in_batches(tmp_path):
+    path = str(tmp_path / 'events.jsonl')
+    # The writer waits an hour for a batch to build up, so nothing is written until flush
+    log = EventLog(path, level=DEBUG, flush_interval=3600)
+    for tick in range(100):
+        log.record(DEBUG, 'tick', tick=tick)
+    assert read_records(path) == []
+
+    log.flush()
+    assert [r['tick'] for r in read_records(path)] == list(range(100))
+    assert log.written == 100
+    log.close()
+
+
+def test_full_buffer_drops_the_oldest_records(tmp_path):
+    path = str(tmp_path / 'events.jsonl')
+    log = EventLog(path, level=DEBUG, capacity=10, flush_interval=3600)
+    for tick in range(25):
+        log.record(DEBUG, 'tick', tick=tick)
+    assert log.dropped == 15
+    log.close()
+
+    assert [r['tick'] for r in read_records(path)] == list(range(15, 25))
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from conftest import play
+from replay import CASUAL, LEVEL, MISSION, Replay, ReplayRecorder, start_game, state_checksum
+from snake_engine import GameState
+import snapshot
+
+
+def record(mode, seed, ticks, keyframe_interval=50):
+    """Play a game with random turns; returns (engine, replay bytes, checksums by tick)"""
+    engine = GameState(22, 17, rng=random.Random(seed))
+    start_game(engine, mode, seed, boulder_count=5, level=2)
+    recorder = ReplayRecorder(engine, mode, boulder_count=5, level=2, keyframe_interval=keyframe_interval)
+    rng = random.Random(seed)
+    checksums = {0: state_checksum(engine)}
+    for _ in range(ticks):
+        play(engine, 1, rng)
+        recorder.record()
+        checksums[engine.tick] = state_checksum(engine)
+        if engine.game_over:
+            break
+    return engine, recorder.to_bytes(), checksums
+
+
+@pytest.mark.parametrize('mode', [CASUAL, LEVEL, MISSION])
+def test_playback_is_bit_exact(mode):
+    for seed in range(4):
+        engine, data, _ = record(mode, seed, 1500)
+        replay = Replay(data)
+        assert replay.final_tick == engine.tick
+        assert replay.verify()
+
+
+def test_seek_matches_playback():
+    engine, data, checksums = record(CASUAL, 11, 1500)
+    replay = Replay(data)
+    assert replay.keyframe_ticks
+    rng = random.Random(2)
+    reused = GameState(22, 17)
+    for tick in [0, 1, 50, 51, replay.final_tick] + [rng.randrange(replay.final_tick + 1) for _ in range(20)]:
+        assert state_checksum(replay.seek(tick)) == checksums[tick]
+        assert state_checksum(replay.seek(tick, reused)) == checksums[tick]
+
+
+def test_resume_and_rewind_keep_replay_exact():
+    engine = GameState(22, 17, rng=random.Random(3))
+    start_game(engine, CASUAL, 42, boulder_count=3)
+    recorder = ReplayRecorder(engine, CASUAL, boulder_count=3, keyframe_interval=40)
+    rng = random.Random(3)
+    for _ in range(100):
+        play(engine, 1, rng, turn_chance=0.1)
+        recorder.record()
+    checkpoint = engine.tick
+    saved = snapshot.dump(engine)
+
+    # Carry on, then go back to the checkpoint
+    for _ in range(200):
+        play(engine, 1, rng)
+        recorder.record()
+    snapshot.restore(engine, saved)
+    recorder.rewind()
+    assert engine.tick == checkpoint
+
+    # Suspend and resume, then finish the game
+    recorder = ReplayRecorder.resume(engine, recorder.to_bytes())
+    for _ in range(300):
+        play(engine, 1, rng)
+        recorder.record()
+    assert Replay(recorder.to_bytes()).verify()
+
+
+def test_casual_game_after_a_mission():
+    # The window reuses one engine for every game
+    engine = GameState(22, 17, rng=random.Random(8))
+    start_game(engine, MISSION, 5)
+    play(engine, 400, random.Random(8))
+    assert engine.oxygen_level != 100
+
+    start_game(engine, CASUAL, 6, boulder_count=4)
+    recorder = ReplayRecorder(engine, CASUAL, boulder_count=4)
+    rng = random.Random(9)
+    for _ in range(300):
+        play(engine, 1, rng)
+        recorder.record()
+    assert Replay(recorder.to_bytes()).verify()
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        Replay(b'not a replay at all')
+
@@ -0,0 +1,108 @@
+from scheduler import Scheduler
+
+
+class FakeClock:
+    """Monotonic clock in seconds that only moves when told to"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, scheduler, ms):
+        """Move the clock ms forward one millisecond at a time, firing due timers"""
+        for _ in range(ms):
+            self.time += 0.001
+            scheduler.run_due()
+
+
+def test_timers_fire_in_deadline_order():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    fired = []
+    slow = scheduler.timer(lambda: fired.append('slow'), 30)
+    fast = scheduler.timer(lambda: fired.append('fast'), 20)
+    once = scheduler.timer(lambda: fired.append('once'), 25, single_shot=True)
+    for timer in (slow, fast, once):
+        timer.start()
+    assert scheduler.next_deadline() == 20
+
+    clock.advance(scheduler, 60)
+    assert fired == ['fast', 'once', 'slow', 'fast', 'slow', 'fast']
+    assert not once.is_active()
+
+
+def test_stopped_timer_does_not_fire():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    fired = []
+    timer = scheduler.timer(lambda: fired.append(clock.time), 10)
+    timer.start()
+    clock.advance(scheduler, 5)
+    timer.stop()
+    clock.advance(scheduler, 50)
+    assert fired == []
+    assert scheduler.next_deadline() is None
+
+
+def test_pause_keeps_the_time_left():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    fired = []
+    game = scheduler.timer(lambda: fired.append(('game', round(clock.time * 1000))), 100, group='game')
+    blink = scheduler.timer(lambda: fired.append(('blink', round(clock.time * 1000))), 100)
+    game.start()
+    blink.start()
+
+    clock.advance(scheduler, 70)
+    scheduler.pause('game')
+    clock.advance(scheduler, 500)
+    scheduler.resume('game')
+    clock.advance(scheduler, 30)
+
+    # The game timer had 30 ms left when paused; other groups ran on
+    assert [t for name, t in fired if name == 'game'] == [600]
+    assert [t for name, t in fired if name == 'blink'] == [100, 200, 300, 400, 500, 600]
+
+
+def test_timer_started_while_paused_waits_for_resume():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    fired = []
+    scheduler.pause('game')
+    timer = scheduler.timer(lambda: fired.append(round(clock.time * 1000)), 40, single_shot=True, group='game')
+    timer.start()
+    assert timer.is_active()
+    clock.advance(scheduler, 100)
+    assert fired == []
+
+    scheduler.resume('game')
+    clock.advance(scheduler, 40)
+    assert fired == [140]
+
+
+def test_host_is_told_the_earliest_deadline():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    deadlines = []
+    scheduler.on_reschedule = deadlines.append
+    timer = scheduler.timer(lambda: None, 50)
+    timer.start()
+    timer.stop()
+    assert deadlines == [50, None]
+
+
+def test_wakeups_per_second():
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    mark = scheduler.mark()
+    assert scheduler.wakeups_per_second(mark) == 0.0
+
+    # The host wakes the scheduler only at deadlines: 4 times a second
+    timer = scheduler.timer(lambda: None, 250)
+    timer.start()
+    for _ in range(8):
+        clock.time = scheduler.next_deadline() / 1000
+        scheduler.run_due()
+    assert scheduler.wakeups_per_second(mark) == 4.0
@@ -0,0 +1,106 @@
+import json
+import sqlite3
+
+import pytest
+
+from score_store import SCHEMA_VERSION, ScoreStore, ScoreWriter
+
+
+def test_migrates_legacy_json(tmp_path):
+    legacy = tmp_path / 'high_score.json'
+    legacy.write_text(json.dumps({'high_score': 30, 'scores': [12, 5, 0, 'x', 20]}))
+    path = str(tmp_path / 'scores.db')
+
+    store = ScoreStore(path, legacy_json=str(legacy))
+    assert sorted(score for score, *_ in store.top_scores(10)) == [5, 12, 20, 30]
+    assert store.high_score() == 30
+    assert {mode for _, mode, *_ in store.top_scores(10)} == {'casual'}
+    store.close()
+
+    # Imported once: reopening does not import the file again
+    store = ScoreStore(path, legacy_json=str(legacy))
+    assert len(store.top_scores(10)) == 4
+    store.close()
+
+
+def test_migrates_version_1_database(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE games (id INTEGER PRIMARY KEY, score INTEGER NOT NULL, played_at REAL NOT NULL)')
+    connection.executemany('INSERT INTO games (score, played_at) VALUES (?, 0)', [(3,), (8,), (8,)])
+    connection.execute('PRAGMA user_version = 1')
+    connection.commit()
+    connection.close()
+
+    store = ScoreStore(path)
+    assert store.connection.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    assert store.percentile(8, 'casual') == 100 / 3
+    store.record_game(9, 'mission', level=1, crystals=4)
+    assert store.best_score('mission') == 9
+    assert store.percentile(10, 'mission') == 100
+    store.close()
+
+
+def test_writer_saves_in_background(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    ScoreStore(path).close()
+    writer = ScoreWriter(path)
+    for score in range(5):
+        writer.record_game(score, 'campaign', level=2)
+    writer.flush()
+    writer.close()
+
+    store = ScoreStore(path)
+    assert store.best_score('campaign') == 4
+    store.close()
+
+
+def test_writer_reports_an_unopenable_database(tmp_path):
+    path = tmp_path / 'scores.db'
+    path.write_bytes(b'this is not an SQLite database' * 100)
+    errors = []
+    writer = ScoreWriter(str(path), on_error=errors.append)
+    writer.record_game(5)
+    writer.flush()  # Returns instead of waiting forever
+    writer.record_game(6)
+    writer.write_file(str(tmp_path / 'last_game.replay'), b'replay')  # Files are still written
+    writer.flush()
+    writer.close()
+    assert len(errors) == 1 and isinstance(errors[0], sqlite3.DatabaseError)
+    assert writer.pending == []
+    assert (tmp_path / 'last_game.replay').read_bytes() == b'replay'
+
+
+def test_unreadable_database_raises(tmp_path):
+    path = tmp_path / 'scores.db'
+    path.write_bytes(b'this is not an SQLite database' * 100)
+    with pytest.raises(sqlite3.DatabaseError):
+        ScoreStore(str(path))
+
+
+def test_writer_writes_files(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    errors = []
+    writer = ScoreWriter(path, on_error=errors.append)
+    writer.write_file(str(tmp_path / 'last_game.replay'), b'first')
+    writer.write_file(str(tmp_path / 'last_game.replay'), b'second')
+    writer.write_file(str(tmp_path / 'missing' / 'file'), b'lost')
+    writer.flush()
+    writer.close()
+    assert (tmp_path / 'last_game.replay').read_bytes() == b'second'
+    assert len(errors) == 1 and isinstance(errors[0], OSError)
+
+
+def test_writer_ranks_saved_games(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    ranked = []
+    writer = ScoreWriter(path, on_recorded=lambda token, percentile: ranked.append((token, percentile)))
+    writer.record_game(10, 'mission', token=1)
+    writer.flush()
+    for token, score in enumerate((5, 20, 10), start=2):
+        writer.record_game(score, 'mission', token=token)
+        writer.flush()
+    writer.record_game(50, 'casual', token=5)
+    writer.close()
+    # Against the earlier games of the same mode only
+    assert ranked == [(1, None), (2, 0), (3, 100), (4, 100 / 3), (5, None)]
@@ -0,0 +1,97 @@
+import random
+import zlib
+
+import pytest
+
+from conftest import play
+from replay import CASUAL, ReplayRecorder, state_checksum
+from snake_engine import GameState
+import snapshot
+
+
+def test_restore_round_trip(rng):
+    engine = GameState(22, 17, rng=random.Random(5))
+    engine.start_mission()
+    play(engine, 150, rng)
+    data = snapshot.dump(engine)
+
+    copy = GameState(22, 17)
+    snapshot.restore(copy, data)
+    assert state_checksum(copy) == state_checksum(engine)
+    assert snapshot.dump(copy) == data
+
+    # Both carry on identically, random draws included
+    for _ in range(300):
+        engine.step()
+        copy.step()
+    assert state_checksum(copy) == state_checksum(engine)
+    assert copy.rng.getstate() == engine.rng.getstate()
+
+
+def test_saved_game_file(tmp_path, rng):
+    engine = GameState(22, 17, rng=random.Random(6))
+    engine.reset(boulder_count=5)
+    play(engine, 80, rng)
+    path = str(tmp_path / 'saved_game.snapshot')
+    snapshot.save_game(path, engine, b'replay bytes')
+
+    state, replay_data = snapshot.load_game(path)
+    assert state == snapshot.dump(engine)
+    assert replay_data == b'replay bytes'
+
+
+def rewrap(data, body):
+    return data[:5] + zlib.compress(body)
+
+
+def test_rejects_damaged_snapshots(rng):
+    engine = GameState(22, 17, rng=random.Random(8))
+    engine.reset(boulder_count=5)
+    play(engine, 60, rng)
+    data = snapshot.dump(engine)
+    body = zlib.decompress(data[5:])
+    header = list(snapshot.SCALARS.unpack_from(body))
+
+    damaged = [
+        b'SNKX' + data[4:],
+        data[:5] + b'not zlib',
+        data[:-10],
+        rewrap(data, body[:snapshot.SCALARS.size + 100]),  # Cut just after the header
+        rewrap(data, body + b'\0\0'),
+    ]
+    for field, value in ((6, 9), (23, 22)):  # Direction, food x
+        bad = list(header)
+        bad[field] = value
+        damaged.append(rewrap(data, snapshot.SCALARS.pack(*bad) + body[snapshot.SCALARS.size:]))
+    # A snake cell off the board
+    start = snapshot.SCALARS.size + 22 * 17
+    damaged.append(rewrap(data, body[:start] + b'\xff' * 4 + body[start + 4:]))
+
+    target = GameState(22, 17, rng=random.Random(9))
+    before = snapshot.dump(target)
+    for bad in damaged:
+        with pytest.raises(ValueError):
+            snapshot.restore(target, bad)
+        assert snapshot.dump(target) == before
+    target.step()  # Still a working game
+
+
+def test_rejects_other_board_size(rng):
+    engine = GameState(22, 17)
+    with pytest.raises(snapshot.BoardSizeError):
+        snapshot.restore(GameState(30, 17), snapshot.dump(engine))
+
+
+def test_large_board(rng):
+    # More cells than 16-bit indices can address
+    engine = GameState(300, 300, rng=random.Random(10))
+    engine.reset(boulder_count=40)
+    recorder = ReplayRecorder(engine, CASUAL, boulder_count=40, keyframe_interval=60)
+    for _ in range(150):
+        play(engine, 1, rng)
+        recorder.record()
+    assert recorder.keyframes
+
+    copy = GameState(300, 300)
+    snapshot.restore(copy, snapshot.dump(engine))
+    assert state_checksum(copy) == state_checksum(engine)